@@ -14,10 +14,42 @@ Example:
     >>> structure = fetch_repo_structure("https://github.com/user/repo", token="your_token")
 """
 
-from .callstack import CallStackGenerator
-from .core import fetch_repo_structure
-from .repo_tree import RepoTreeGenerator
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .callstack import CallStackGenerator
+    from .core import fetch_repo_structure, fetch_repo_structures
+    from .repo_tree import RepoTreeGenerator
 
 __version__ = "0.1.0"
 
-__all__ = ["RepoTreeGenerator", "fetch_repo_structure", "CallStackGenerator"]
+__all__ = [
+    "RepoTreeGenerator",
+    "fetch_repo_structure",
+    "fetch_repo_structures",
+    "CallStackGenerator",
+]
+
+# The public names are imported on first access, so that importing the
+# package (e.g. for __version__ in the CLI) does not load the provider clients
+_LAZY_IMPORTS = {
+    "CallStackGenerator": ".callstack",
+    "fetch_repo_structure": ".core",
+    "fetch_repo_structures": ".core",
+    "RepoTreeGenerator": ".repo_tree",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the public names of the package on first access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
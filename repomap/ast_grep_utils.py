@@ -1,10 +1,78 @@
 """Utility module for ast-grep integration."""
 
-import os
+import hashlib
+import logging
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .config import settings
+from .utils import load_json_cache, store_json_cache
+
+if TYPE_CHECKING:
+    from ast_grep_py import SgNode, SgRoot
+
+logger = logging.getLogger(__name__)
+
+# Shared by the call-name helpers, which run once per call site
+_WHITESPACE_RE = re.compile(r'\s+')
+_SIMPLE_NAME_RE = re.compile(r'^([a-zA-Z_][a-zA-Z0-9_]*(?:\.[a-zA-Z_][a-zA-Z0-9_]*)?)')
+
+
+class AstDefinition:
+    """A function, method or class definition found in a syntax tree.
+
+    Slotted rather than a dict: a large repository yields one per definition,
+    and the extractors only ever read a fixed set of fields.
+    """
+
+    __slots__ = ('name', 'start_line', 'end_line', 'node', 'class_name')
+
+    def __init__(
+        self,
+        name: str,
+        start_line: int,
+        end_line: int,
+        node: Any,
+        class_name: Optional[str] = None,
+    ):
+        self.name = name
+        self.start_line = start_line
+        self.end_line = end_line
+        self.node = node
+        self.class_name = class_name
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dictionary form returned by the public API.
 
-from ast_grep_py import SgRoot
+        Returns:
+            Dictionary with name, start_line, end_line, node and, for methods,
+            class
+        """
+        info = {
+            'name': self.name,
+            'start_line': self.start_line,
+            'end_line': self.end_line,
+            'node': self.node,
+        }
+        if self.class_name:
+            info['class'] = self.class_name
+        return info
 
 
 class AstGrepParser:
@@ -56,9 +124,115 @@ class AstGrepParser:
         'c_sharp': 'csharp',
     }
 
-    def __init__(self):
-        """Initialize the ast-grep parser."""
+    # Language-specific call node types
+    CALL_KINDS = {
+        'python': ('call',),
+        'javascript': ('call_expression',),
+        'typescript': ('call_expression',),
+        'tsx': ('call_expression',),
+        'go': ('call_expression',),
+        'c': ('call_expression',),
+        'cpp': ('call_expression',),
+        'java': ('method_invocation',),
+        'php': ('function_call_expression',),
+        'csharp': ('invocation_expression',),
+    }
+
+    # Definition node kinds per language, in reporting order, with the extractor
+    # method and the extra arguments it takes after the node
+    FUNCTION_EXTRACTORS = {
+        'python': (
+            ('function_definition', '_extract_named_def', ('class_definition',)),
+        ),
+        'go': (
+            ('function_declaration', '_extract_named_def', ()),
+            ('method_declaration', '_extract_go_method', ()),
+        ),
+        'c': (('function_definition', '_extract_c_function', ('c',)),),
+        'cpp': (('function_definition', '_extract_c_function', ('cpp',)),),
+        'java': (
+            ('method_declaration', '_extract_named_def', ('class_declaration',)),
+            ('constructor_declaration', '_extract_named_def', ('class_declaration',)),
+        ),
+        'php': (
+            ('function_definition', '_extract_named_def', ()),
+            ('method_declaration', '_extract_named_def', ('class_declaration',)),
+        ),
+        'csharp': (
+            ('method_declaration', '_extract_named_def', ('class_declaration',)),
+        ),
+        **dict.fromkeys(
+            ('javascript', 'typescript', 'tsx'),
+            (
+                ('function_declaration', '_extract_named_def', ()),
+                ('method_definition', '_extract_named_def', ('class_declaration',)),
+                ('arrow_function', '_extract_js_arrow_function', ()),
+            ),
+        ),
+    }
+
+    CLASS_EXTRACTORS = {
+        'python': (('class_definition', '_extract_named_def', ()),),
+        **dict.fromkeys(
+            ('cpp', 'java', 'csharp', 'javascript', 'typescript', 'tsx'),
+            (('class_declaration', '_extract_named_def', ()),),
+        ),
+        # Go uses type declarations for structs
+        'go': (('type_declaration', '_extract_go_type', ()),),
+    }
+
+    # Import node kinds per language with the method turning one into names
+    IMPORT_EXTRACTORS = {
+        'python': (
+            ('import_statement', '_extract_dotted_imports'),
+            ('import_from_statement', '_extract_dotted_imports'),
+        ),
+        'c': (('preproc_include', '_extract_include_imports'),),
+        'cpp': (('preproc_include', '_extract_include_imports'),),
+        'go': (('import_declaration', '_extract_go_imports'),),
+        'java': (('import_declaration', '_extract_import_text'),),
+        **dict.fromkeys(
+            ('javascript', 'typescript', 'tsx'),
+            (('import_statement', '_extract_import_text'),),
+        ),
+    }
+
+    # Substrings at least one of which any file with a definition or import the
+    # extractors report must contain; large files without any are not parsed
+    DEFINITION_SENTINELS = {
+        'python': ('def', 'class', 'import'),
+        'go': ('func', 'type', 'import'),
+        'c': ('(', '#include'),
+        'cpp': ('(', 'class', '#include'),
+        'java': ('(', 'class', 'import'),
+        'php': ('function', 'class'),
+        'csharp': ('(', 'class'),
+        'javascript': ('(', '=>', 'class', 'import'),
+        'typescript': ('(', '=>', 'class', 'import'),
+        'tsx': ('(', '=>', 'class', 'import'),
+    }
+
+    # Files below this many characters are always parsed; the prefilter only
+    # pays off for large generated or data-only files
+    SENTINEL_PREFILTER_MIN_SIZE = 200_000
+
+    # Bump whenever the output of extract_comprehensive_ast_data changes so that
+    # entries written by older versions are not served from the on-disk cache
+    AST_CACHE_VERSION = 1
+
+    # ast_grep_py.SgRoot, set by _sg_root_class on first use
+    _SgRoot = None
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """Initialize the ast-grep parser.
+
+        Args:
+            cache_dir: Optional directory for the on-disk AST cache. Defaults to the
+                REPOMAP_CACHE_DIR setting; caching is disabled when neither is set.
+        """
         self.custom_rules_dir = Path(__file__).parent.parent / "custom-rules"
+        cache_dir = cache_dir or settings.REPOMAP_CACHE_DIR
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
 
     def detect_language(self, file_path: str) -> Optional[str]:
         """Detect programming language from file extension.
@@ -69,10 +243,44 @@ class AstGrepParser:
         Returns:
             str: Language identifier or None if unsupported
         """
-        ext = os.path.splitext(file_path)[1].lower()
-        return self.SUPPORTED_LANGUAGES.get(ext)
+        return self.SUPPORTED_LANGUAGES.get(self._file_extension(file_path))
+
+    @staticmethod
+    def _file_extension(file_path: str) -> str:
+        """Get the lower-cased extension of a file path, including the dot.
+
+        Equivalent to os.path.splitext for POSIX paths, but a single rpartition
+        on the file name is cheaper when called for every file of a repository.
 
-    def parse_code(self, content: str, language: str) -> Optional[SgRoot]:
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            str: Extension such as '.py', or an empty string if there is none
+        """
+        stem, dot, ext = file_path.rpartition('/')[2].rpartition('.')
+        # Leading dots mark hidden files, not extensions (e.g. '.bashrc')
+        if not stem.strip('.'):
+            return ''
+        return f"{dot}{ext.lower()}"
+
+    @classmethod
+    def _sg_root_class(cls) -> type:
+        """Get ast-grep's SgRoot, importing it on first use.
+
+        Loading the native extension is deferred so that importing this module,
+        e.g. only for detect_language, stays cheap.
+
+        Returns:
+            The ast_grep_py.SgRoot class
+        """
+        if cls._SgRoot is None:
+            from ast_grep_py import SgRoot
+
+            cls._SgRoot = SgRoot
+        return cls._SgRoot
+
+    def parse_code(self, content: str, language: str) -> Optional['SgRoot']:
         """Parse source code using ast-grep.
 
         Args:
@@ -82,187 +290,147 @@ class AstGrepParser:
         Returns:
             SgRoot: Parsed AST root or None if parsing failed
         """
+        # Outside the try: a missing ast-grep install must not look like a bad file
+        sg_root_class = self._sg_root_class()
         try:
             ast_grep_lang = self.AST_GREP_LANG_MAP.get(language, language)
-            root = SgRoot(content, ast_grep_lang)
+            root = sg_root_class(content, ast_grep_lang)
             return root
         except Exception as e:
-            print(f"Failed to parse code with ast-grep for language {language}: {e}")
+            # Lazy %-formatting: per-file, and dropped at the default log level
+            logger.debug(
+                "Failed to parse code with ast-grep for language %s: %s", language, e
+            )
             return None
 
-    def find_functions(
-        self, root: SgRoot, language: str
-    ) -> List[Dict[str, Any]]:
-        """Find all function definitions in the AST.
+    def _collect_nodes_by_kind(
+        self, node, kinds: Iterable[str]
+    ) -> Dict[str, List[Any]]:
+        """Collect descendant nodes of several kinds with a single tree traversal.
 
         Args:
-            root: SgRoot object
-            language: Programming language
+            node: Node to search under
+            kinds: Node kinds to collect
 
         Returns:
-            List of function information dictionaries
+            Dictionary mapping each kind to its nodes in document order
         """
-        functions = []
+        buckets: Dict[str, List[Any]] = {kind: [] for kind in kinds}
+        if not buckets:
+            return buckets
         try:
-            node = root.root()
+            matches = node.find_all(any=[{'kind': kind} for kind in buckets])
         except Exception:
-            return functions
+            # Fall back to one traversal per kind, skipping kinds the grammar lacks
+            for kind in buckets:
+                try:
+                    buckets[kind] = list(node.find_all(kind=kind))
+                except Exception:
+                    continue
+            return buckets
+
+        for match in matches:
+            bucket = buckets.get(match.kind())
+            if bucket is not None:
+                bucket.append(match)
+        return buckets
 
-        try:
-            if language == 'python':
-                # Find all function definitions
-                func_nodes = node.find_all(kind='function_definition')
-                for func_node in func_nodes:
-                    func_info = self._extract_python_function(func_node)
-                    if func_info:
-                        functions.append(func_info)
+    def find_functions(
+        self, root: Union['SgRoot', 'SgNode'], language: str
+    ) -> List[AstDefinition]:
+        """Find all function definitions in the AST.
 
-            elif language == 'go':
-                # Find function declarations
-                func_nodes = node.find_all(kind='function_declaration')
-                for func_node in func_nodes:
-                    func_info = self._extract_go_function(func_node)
-                    if func_info:
-                        functions.append(func_info)
-
-                # Find method declarations
-                method_nodes = node.find_all(kind='method_declaration')
-                for method_node in method_nodes:
-                    func_info = self._extract_go_method(method_node)
-                    if func_info:
-                        functions.append(func_info)
-
-            elif language in ('c', 'cpp'):
-                # Find function definitions
-                func_nodes = node.find_all(kind='function_definition')
-                for func_node in func_nodes:
-                    func_info = self._extract_c_function(func_node, language)
-                    if func_info:
-                        functions.append(func_info)
-
-            elif language == 'java':
-                # Find method declarations
-                method_nodes = node.find_all(kind='method_declaration')
-                for method_node in method_nodes:
-                    func_info = self._extract_java_method(method_node)
-                    if func_info:
-                        functions.append(func_info)
-
-                # Find constructor declarations
-                constructor_nodes = node.find_all(kind='constructor_declaration')
-                for constructor_node in constructor_nodes:
-                    func_info = self._extract_java_constructor(constructor_node)
-                    if func_info:
-                        functions.append(func_info)
-
-            elif language == 'php':
-                # Find function definitions
-                func_nodes = node.find_all(kind='function_definition')
-                for func_node in func_nodes:
-                    func_info = self._extract_php_function(func_node)
-                    if func_info:
-                        functions.append(func_info)
-
-                # Find method declarations
-                method_nodes = node.find_all(kind='method_declaration')
-                for method_node in method_nodes:
-                    func_info = self._extract_php_method(method_node)
-                    if func_info:
-                        functions.append(func_info)
-
-            elif language == 'csharp':
-                # Find method declarations
-                method_nodes = node.find_all(kind='method_declaration')
-                for method_node in method_nodes:
-                    func_info = self._extract_csharp_method(method_node)
-                    if func_info:
-                        functions.append(func_info)
+        Args:
+            root: SgRoot object, or its already unwrapped root node
+            language: Programming language
 
-            elif language in ('javascript', 'typescript', 'tsx'):
-                # Find function declarations
-                func_nodes = node.find_all(kind='function_declaration')
-                for func_node in func_nodes:
-                    func_info = self._extract_js_function(func_node)
-                    if func_info:
-                        functions.append(func_info)
-
-                # Find method definitions
-                method_nodes = node.find_all(kind='method_definition')
-                for method_node in method_nodes:
-                    func_info = self._extract_js_method(method_node)
-                    if func_info:
-                        functions.append(func_info)
-
-                # Find arrow functions assigned to variables
-                arrow_nodes = node.find_all(kind='arrow_function')
-                for arrow_node in arrow_nodes:
-                    func_info = self._extract_js_arrow_function(arrow_node)
-                    if func_info:
-                        functions.append(func_info)
+        Returns:
+            List of function definitions
+        """
+        extractors = self.FUNCTION_EXTRACTORS.get(language, ())
+        try:
+            nodes = self._collect_nodes_by_kind(
+                self._root_node(root), [entry[0] for entry in extractors]
+            )
+            return self._extract_definitions(nodes, extractors)
         except Exception:
-            # If any ast-grep operation fails, return what we have so far
-            pass
-
-        return functions
+            # If any ast-grep operation fails, report no functions
+            return []
 
-    def find_classes(self, root: SgRoot, language: str) -> List[Dict[str, Any]]:
+    def find_classes(
+        self, root: Union['SgRoot', 'SgNode'], language: str
+    ) -> List[AstDefinition]:
         """Find all class definitions in the AST.
 
         Args:
-            root: SgRoot object
+            root: SgRoot object, or its already unwrapped root node
             language: Programming language
 
         Returns:
-            List of class information dictionaries
+            List of class definitions
         """
-        classes = []
+        extractors = self.CLASS_EXTRACTORS.get(language, ())
         try:
-            node = root.root()
+            nodes = self._collect_nodes_by_kind(
+                self._root_node(root), [entry[0] for entry in extractors]
+            )
+            return self._extract_definitions(nodes, extractors)
         except Exception:
-            return classes
+            # If any ast-grep operation fails, report no classes
+            return []
 
-        try:
-            if language == 'python':
-                class_nodes = node.find_all(kind='class_definition')
-                for class_node in class_nodes:
-                    class_info = self._extract_python_class(class_node)
-                    if class_info:
-                        classes.append(class_info)
-
-            elif language in ('cpp', 'java', 'csharp'):
-                class_nodes = node.find_all(kind='class_declaration')
-                for class_node in class_nodes:
-                    class_info = self._extract_oop_class(class_node, language)
-                    if class_info:
-                        classes.append(class_info)
+    @classmethod
+    def _root_node(cls, root: Union['SgRoot', 'SgNode']) -> 'SgNode':
+        """Unwrap an SgRoot to its root node; nodes are returned unchanged.
 
-            elif language == 'go':
-                # Go uses type declarations for structs
-                type_nodes = node.find_all(kind='type_declaration')
-                for type_node in type_nodes:
-                    class_info = self._extract_go_type(type_node)
-                    if class_info:
-                        classes.append(class_info)
+        Args:
+            root: SgRoot object or node
 
-            elif language in ('javascript', 'typescript', 'tsx'):
-                class_nodes = node.find_all(kind='class_declaration')
-                for class_node in class_nodes:
-                    class_info = self._extract_js_class(class_node)
-                    if class_info:
-                        classes.append(class_info)
+        Returns:
+            Node to search under
+        """
+        return root.root() if isinstance(root, cls._sg_root_class()) else root
+
+    def _extract_definitions(
+        self,
+        nodes: Dict[str, List[Any]],
+        extractors: Tuple[Tuple[str, str, Tuple[Any, ...]], ...],
+    ) -> List[AstDefinition]:
+        """Run definition extractors over collected nodes of their kinds.
+
+        Args:
+            nodes: Nodes by kind, as from _collect_nodes_by_kind
+            extractors: (node kind, extractor method name, extra arguments)
+                entries, as in FUNCTION_EXTRACTORS
+
+        Returns:
+            List of definitions, grouped by kind in the order of extractors
+        """
+        definitions = []
+        # One guard for the whole loop instead of one per extracted node; if a
+        # malformed node makes ast-grep raise, keep what was found so far
+        try:
+            for kind, extractor_name, extra_args in extractors:
+                extractor = getattr(self, extractor_name)
+                for def_node in nodes[kind]:
+                    definition = extractor(def_node, *extra_args)
+                    if definition:
+                        definitions.append(definition)
         except Exception:
-            # If any ast-grep operation fails, return what we have
             pass
-
-        return classes
+        return definitions
 
     def find_function_calls(
-        self, root: SgRoot, language: str, start_line: int, end_line: int
+        self,
+        root: Union['SgRoot', 'SgNode'],
+        language: str,
+        start_line: int,
+        end_line: int,
     ) -> Set[str]:
         """Find all function calls within a line range.
 
         Args:
-            root: SgRoot object
+            root: SgRoot object, or its already unwrapped root node
             language: Programming language
             start_line: Start line number
             end_line: End line number
@@ -270,143 +438,175 @@ class AstGrepParser:
         Returns:
             Set of function names that are called
         """
-        calls = set()
-        node = root.root()
-
-        # Language-specific call node types
-        call_kinds = {
-            'python': ['call'],
-            'javascript': ['call_expression'],
-            'typescript': ['call_expression'],
-            'tsx': ['call_expression'],
-            'go': ['call_expression'],
-            'c': ['call_expression'],
-            'cpp': ['call_expression'],
-            'java': ['method_invocation'],
-            'php': ['function_call_expression'],
-            'csharp': ['invocation_expression'],
-        }
+        return set(self.iter_function_calls(root, language, start_line, end_line))
 
-        # Get the appropriate call kinds for this language
-        kinds = call_kinds.get(language, ['call', 'call_expression'])
+    def iter_function_calls(
+        self,
+        root: Union['SgRoot', 'SgNode'],
+        language: str,
+        start_line: int,
+        end_line: int,
+    ) -> Iterator[str]:
+        """Yield the functions called within a line range.
 
+        Args:
+            root: SgRoot object, or its already unwrapped root node
+            language: Programming language
+            start_line: Start line number
+            end_line: End line number
+
+        Yields:
+            Unique names of the functions called, in source order
+        """
+        node = self._root_node(root)
+        call_sites = self._find_call_sites(node, language)
+        node_range = node.range()
+        if start_line <= node_range.start.line and node_range.end.line <= end_line:
+            # Searching a subtree within the range, e.g. the function itself:
+            # every call found is in range, so there is nothing to filter
+            yield from dict.fromkeys(call_name for _, call_name in call_sites)
+        else:
+            yield from self._calls_in_range(call_sites, start_line, end_line)
+
+    def _find_call_sites(self, node, language: str) -> List[Tuple[int, str]]:
+        """Collect every call in the tree with a single traversal.
+
+        Args:
+            node: Root node to search under
+            language: Programming language
+
+        Returns:
+            List of (start line, called name) tuples sorted by line
+        """
+        kinds = self.CALL_KINDS.get(language, ('call', 'call_expression'))
+        return self._extract_call_sites(
+            self._collect_nodes_by_kind(node, kinds), kinds, language
+        )
+
+    def _extract_call_sites(
+        self, nodes: Dict[str, List[Any]], kinds: Iterable[str], language: str
+    ) -> List[Tuple[int, str]]:
+        """Turn collected call nodes into call sites.
+
+        Args:
+            nodes: Nodes by kind, as from _collect_nodes_by_kind
+            kinds: Call node kinds to read from nodes
+            language: Programming language
+
+        Returns:
+            List of (start line, called name) tuples sorted by line
+        """
+        call_sites = []
         for kind in kinds:
-            try:
-                call_nodes = node.find_all(kind=kind)
-                for call_node in call_nodes:
-                    try:
-                        call_range = call_node.range()
-                        call_start_line = call_range.start.line
-
-                        if start_line <= call_start_line <= end_line:
-                            call_name = self._extract_call_name(call_node, language)
-                            if call_name:
-                                calls.add(call_name)
-                    except Exception:
-                        # Skip problematic nodes
-                        continue
-            except Exception:
-                # If the kind doesn't exist for this language, skip it
-                continue
-
-        return calls
-
-    def _extract_python_function(self, func_node) -> Optional[Dict[str, Any]]:
-        """Extract function information from Python function node."""
-        try:
-            func_range = func_node.range()
-            func_name_node = func_node.field('name')
-            if not func_name_node:
-                return None
+            for call_node in nodes[kind]:
+                try:
+                    call_start_line = call_node.range().start.line
+                    call_name = self._extract_call_name(call_node, language)
+                    if call_name:
+                        call_sites.append((call_start_line, sys.intern(call_name)))
+                except Exception:
+                    # Skip problematic nodes
+                    continue
+
+        call_sites.sort(key=lambda call_site: call_site[0])
+        return call_sites
+
+    @staticmethod
+    def _calls_in_range(
+        call_sites: List[Tuple[int, str]], start_line: int, end_line: int
+    ) -> List[str]:
+        """Select the names of calls starting within a line range.
 
-            func_name = func_name_node.text()
-            # Validate that the function name is not empty
-            if not func_name or not func_name.strip():
-                return None
+        Args:
+            call_sites: Call sites sorted by line, as from _find_call_sites
+            start_line: Start line number
+            end_line: End line number
 
-            # Check if this function is inside a class
-            class_name = None
-            parent = func_node.parent()
-            while parent:
-                if parent.kind() == 'class_definition':
-                    # Found parent class
-                    class_name_node = parent.field('name')
-                    if class_name_node:
-                        class_name = class_name_node.text()
-                    break
-                parent = parent.parent()
+        Returns:
+            Unique names of the functions called, in source order
+        """
+        lo = bisect_left(call_sites, start_line, key=lambda call_site: call_site[0])
+        hi = bisect_right(call_sites, end_line, key=lambda call_site: call_site[0])
+        # dict.fromkeys dedupes in one pass and, unlike a set, keeps the
+        # output order stable across runs
+        return list(dict.fromkeys(call_name for _, call_name in call_sites[lo:hi]))
 
-            result = {
-                'name': func_name,
-                'start_line': func_range.start.line,
-                'end_line': func_range.end.line,
-                'node': func_node,
-            }
+    def _extract_named_def(
+        self, def_node, class_kind: Optional[str] = None
+    ) -> Optional[AstDefinition]:
+        """Extract information from a definition node with a 'name' field.
 
-            if class_name:
-                result['class'] = class_name
+        Covers functions, methods, constructors and classes, which only differ
+        in the kind of their enclosing class node, if any.
 
-            return result
-        except Exception:
+        Args:
+            def_node: Definition node
+            class_kind: Kind of the enclosing class node to record under
+                'class', or None to skip the lookup
+
+        Returns:
+            AstDefinition, or None if the node has no usable name
+        """
+        name_node = def_node.field('name')
+        if not name_node:
             return None
 
-    def _extract_go_function(self, func_node) -> Optional[Dict[str, Any]]:
-        """Extract function information from Go function node."""
-        try:
-            func_range = func_node.range()
-            func_name_node = func_node.field('name')
-            if not func_name_node:
-                return None
+        name = name_node.text()
+        # Validate that the name is not empty
+        if not name or not name.strip():
+            return None
 
-            func_name = func_name_node.text()
-            # Validate that the function name is not empty
-            if not func_name or not func_name.strip():
-                return None
+        def_range = def_node.range()
+        result = AstDefinition(
+            name, def_range.start.line, def_range.end.line, def_node
+        )
 
-            return {
-                'name': func_name,
-                'start_line': func_range.start.line,
-                'end_line': func_range.end.line,
-                'node': func_node,
-            }
-        except Exception:
-            return None
+        if class_kind:
+            # Check if this definition is inside a class
+            parent = def_node.parent()
+            while parent:
+                if parent.kind() == class_kind:
+                    class_name_node = parent.field('name')
+                    class_name = class_name_node.text() if class_name_node else None
+                    if class_name:
+                        result.class_name = class_name
+                    break
+                parent = parent.parent()
 
-    def _extract_go_method(self, method_node) -> Optional[Dict[str, Any]]:
+        return result
+
+    def _extract_go_method(self, method_node) -> Optional[AstDefinition]:
         """Extract method information from Go method node."""
-        try:
-            method_range = method_node.range()
-            method_name_node = method_node.field('name')
-            if not method_name_node:
-                return None
+        method_range = method_node.range()
+        method_name_node = method_node.field('name')
+        if not method_name_node:
+            return None
 
-            method_name = method_name_node.text()
-            # Validate that the method name is not empty
-            if not method_name or not method_name.strip():
-                return None
+        method_name = method_name_node.text()
+        # Validate that the method name is not empty
+        if not method_name or not method_name.strip():
+            return None
 
-            # Extract receiver type
-            receiver_node = method_node.field('receiver')
-            receiver_type = None
-            if receiver_node:
-                # Find type identifier in receiver
-                type_children = receiver_node.children()
-                for child in type_children:
-                    if child.kind() in ('type_identifier', 'pointer_type'):
-                        receiver_type = child.text().replace('*', '').strip()
-                        break
+        # Extract receiver type
+        receiver_node = method_node.field('receiver')
+        receiver_type = None
+        if receiver_node:
+            # Find type identifier in receiver
+            type_children = receiver_node.children()
+            for child in type_children:
+                if child.kind() in ('type_identifier', 'pointer_type'):
+                    receiver_type = child.text().replace('*', '').strip()
+                    break
 
-            return {
-                'name': method_name,
-                'start_line': method_range.start.line,
-                'end_line': method_range.end.line,
-                'class': receiver_type,
-                'node': method_node,
-            }
-        except Exception:
-            return None
+        return AstDefinition(
+            method_name,
+            method_range.start.line,
+            method_range.end.line,
+            method_node,
+            receiver_type,
+        )
 
-    def _extract_c_function(self, func_node, language: str) -> Optional[Dict[str, Any]]:
+    def _extract_c_function(self, func_node, language: str) -> Optional[AstDefinition]:
         """Extract function information from C/C++ function node."""
         try:
             func_range = func_node.range()
@@ -463,356 +663,53 @@ class AstGrepParser:
                         break
                     parent = parent.parent()
 
-            result = {
-                'name': func_name,
-                'start_line': func_range.start.line,
-                'end_line': func_range.end.line,
-                'node': func_node,
-            }
-
-            if class_name:
-                result['class'] = class_name
-
-            return result
-        except Exception:
-            return None
-
-    def _extract_java_method(self, method_node) -> Optional[Dict[str, Any]]:
-        """Extract method information from Java method node."""
-        try:
-            method_range = method_node.range()
-            method_name_node = method_node.field('name')
-            if not method_name_node:
-                return None
-
-            method_name = method_name_node.text()
-            # Validate that the method name is not empty
-            if not method_name or not method_name.strip():
-                return None
-
-            # Check if this method is inside a class
-            class_name = None
-            parent = method_node.parent()
-            while parent:
-                if parent.kind() == 'class_declaration':
-                    # Found parent class
-                    class_name_node = parent.field('name')
-                    if class_name_node:
-                        class_name = class_name_node.text()
-                    break
-                parent = parent.parent()
-
-            result = {
-                'name': method_name,
-                'start_line': method_range.start.line,
-                'end_line': method_range.end.line,
-                'node': method_node,
-            }
-
-            if class_name:
-                result['class'] = class_name
-
-            return result
-        except Exception:
-            return None
-
-    def _extract_java_constructor(self, constructor_node) -> Optional[Dict[str, Any]]:
-        """Extract constructor information from Java constructor node."""
-        try:
-            constructor_range = constructor_node.range()
-            constructor_name_node = constructor_node.field('name')
-            if not constructor_name_node:
-                return None
-
-            constructor_name = constructor_name_node.text()
-            # Validate that the constructor name is not empty
-            if not constructor_name or not constructor_name.strip():
-                return None
-
-            # Check if this constructor is inside a class
-            class_name = None
-            parent = constructor_node.parent()
-            while parent:
-                if parent.kind() == 'class_declaration':
-                    # Found parent class
-                    class_name_node = parent.field('name')
-                    if class_name_node:
-                        class_name = class_name_node.text()
-                    break
-                parent = parent.parent()
-
-            result = {
-                'name': constructor_name,
-                'start_line': constructor_range.start.line,
-                'end_line': constructor_range.end.line,
-                'node': constructor_node,
-            }
-
-            if class_name:
-                result['class'] = class_name
-
-            return result
-        except Exception:
-            return None
-
-    def _extract_php_function(self, func_node) -> Optional[Dict[str, Any]]:
-        """Extract function information from PHP function node."""
-        try:
-            func_range = func_node.range()
-            func_name_node = func_node.field('name')
-            if not func_name_node:
-                return None
-
-            func_name = func_name_node.text()
-            # Validate that the function name is not empty
-            if not func_name or not func_name.strip():
-                return None
-
-            return {
-                'name': func_name,
-                'start_line': func_range.start.line,
-                'end_line': func_range.end.line,
-                'node': func_node,
-            }
-        except Exception:
-            return None
-
-    def _extract_php_method(self, method_node) -> Optional[Dict[str, Any]]:
-        """Extract method information from PHP method node."""
-        try:
-            method_range = method_node.range()
-            method_name_node = method_node.field('name')
-            if not method_name_node:
-                return None
-
-            method_name = method_name_node.text()
-            # Validate that the method name is not empty
-            if not method_name or not method_name.strip():
-                return None
-
-            # Check if this method is inside a class
-            class_name = None
-            parent = method_node.parent()
-            while parent:
-                if parent.kind() == 'class_declaration':
-                    # Found parent class
-                    class_name_node = parent.field('name')
-                    if class_name_node:
-                        class_name = class_name_node.text()
-                    break
-                parent = parent.parent()
-
-            result = {
-                'name': method_name,
-                'start_line': method_range.start.line,
-                'end_line': method_range.end.line,
-                'node': method_node,
-            }
-
-            if class_name:
-                result['class'] = class_name
-
-            return result
-        except Exception:
-            return None
-
-    def _extract_csharp_method(self, method_node) -> Optional[Dict[str, Any]]:
-        """Extract method information from C# method node."""
-        try:
-            method_range = method_node.range()
-            method_name_node = method_node.field('name')
-            if not method_name_node:
-                return None
-
-            method_name = method_name_node.text()
-            # Validate that the method name is not empty
-            if not method_name or not method_name.strip():
-                return None
-
-            # Check if this method is inside a class
-            class_name = None
-            parent = method_node.parent()
-            while parent:
-                if parent.kind() == 'class_declaration':
-                    # Found parent class
-                    class_name_node = parent.field('name')
-                    if class_name_node:
-                        class_name = class_name_node.text()
-                    break
-                parent = parent.parent()
-
-            result = {
-                'name': method_name,
-                'start_line': method_range.start.line,
-                'end_line': method_range.end.line,
-                'node': method_node,
-            }
-
-            if class_name:
-                result['class'] = class_name
-
-            return result
-        except Exception:
-            return None
-
-    def _extract_js_function(self, func_node) -> Optional[Dict[str, Any]]:
-        """Extract function information from JavaScript function node."""
-        try:
-            func_range = func_node.range()
-            func_name_node = func_node.field('name')
-            if not func_name_node:
-                return None
-
-            func_name = func_name_node.text()
-            # Validate that the function name is not empty
-            if not func_name or not func_name.strip():
-                return None
-
-            return {
-                'name': func_name,
-                'start_line': func_range.start.line,
-                'end_line': func_range.end.line,
-                'node': func_node,
-            }
-        except Exception:
-            return None
-
-    def _extract_js_method(self, method_node) -> Optional[Dict[str, Any]]:
-        """Extract method information from JavaScript method node."""
-        try:
-            method_range = method_node.range()
-            method_name_node = method_node.field('name')
-            if not method_name_node:
-                return None
-
-            method_name = method_name_node.text()
-            # Validate that the method name is not empty
-            if not method_name or not method_name.strip():
-                return None
-
-            # Check if this method is inside a class
-            class_name = None
-            parent = method_node.parent()
-            while parent:
-                if parent.kind() == 'class_declaration':
-                    # Found parent class
-                    class_name_node = parent.field('name')
-                    if class_name_node:
-                        class_name = class_name_node.text()
-                    break
-                parent = parent.parent()
-
-            result = {
-                'name': method_name,
-                'start_line': method_range.start.line,
-                'end_line': method_range.end.line,
-                'node': method_node,
-            }
-
-            if class_name:
-                result['class'] = class_name
-
-            return result
+            return AstDefinition(
+                func_name,
+                func_range.start.line,
+                func_range.end.line,
+                func_node,
+                class_name,
+            )
         except Exception:
             return None
 
-    def _extract_js_arrow_function(self, arrow_node) -> Optional[Dict[str, Any]]:
+    def _extract_js_arrow_function(self, arrow_node) -> Optional[AstDefinition]:
         """Extract arrow function information from JavaScript."""
-        try:
-            # Arrow functions need parent context to get name
-            parent = arrow_node.parent()
-            if parent and parent.kind() == 'variable_declarator':
-                name_node = parent.field('name')
-                if name_node:
-                    func_name = name_node.text()
-                    # Validate that the function name is not empty
-                    if not func_name or not func_name.strip():
-                        return None
-
-                    arrow_range = arrow_node.range()
-                    return {
-                        'name': func_name,
-                        'start_line': arrow_range.start.line,
-                        'end_line': arrow_range.end.line,
-                        'node': arrow_node,
-                    }
-            return None
-        except Exception:
-            return None
-
-    def _extract_python_class(self, class_node) -> Optional[Dict[str, Any]]:
-        """Extract class information from Python class node."""
-        try:
-            class_range = class_node.range()
-            class_name_node = class_node.field('name')
-            if not class_name_node:
-                return None
-
-            class_name = class_name_node.text()
-            return {
-                'name': class_name,
-                'start_line': class_range.start.line,
-                'end_line': class_range.end.line,
-                'node': class_node,
-            }
-        except Exception:
-            return None
-
-    def _extract_oop_class(self, class_node, language: str) -> Optional[Dict[str, Any]]:
-        """Extract class information from OOP language class node."""
-        try:
-            class_range = class_node.range()
-            class_name_node = class_node.field('name')
-            if not class_name_node:
-                return None
+        # Arrow functions need parent context to get name
+        parent = arrow_node.parent()
+        if parent and parent.kind() == 'variable_declarator':
+            name_node = parent.field('name')
+            if name_node:
+                func_name = name_node.text()
+                # Validate that the function name is not empty
+                if not func_name or not func_name.strip():
+                    return None
 
-            class_name = class_name_node.text()
-            return {
-                'name': class_name,
-                'start_line': class_range.start.line,
-                'end_line': class_range.end.line,
-                'node': class_node,
-            }
-        except Exception:
-            return None
+                arrow_range = arrow_node.range()
+                return AstDefinition(
+                    func_name,
+                    arrow_range.start.line,
+                    arrow_range.end.line,
+                    arrow_node,
+                )
+        return None
 
-    def _extract_go_type(self, type_node) -> Optional[Dict[str, Any]]:
+    def _extract_go_type(self, type_node) -> Optional[AstDefinition]:
         """Extract type information from Go type declaration."""
-        try:
-            type_range = type_node.range()
-            # Look for struct types
-            type_spec_nodes = type_node.find_all(kind='type_spec')
-            for spec_node in type_spec_nodes:
-                name_node = spec_node.field('name')
-                type_field = spec_node.field('type')
-                if name_node and type_field and type_field.kind() == 'struct_type':
-                    return {
-                        'name': name_node.text(),
-                        'start_line': type_range.start.line,
-                        'end_line': type_range.end.line,
-                        'node': type_node,
-                    }
-            return None
-        except Exception:
-            return None
-
-    def _extract_js_class(self, class_node) -> Optional[Dict[str, Any]]:
-        """Extract class information from JavaScript class node."""
-        try:
-            class_range = class_node.range()
-            class_name_node = class_node.field('name')
-            if not class_name_node:
-                return None
-
-            class_name = class_name_node.text()
-            return {
-                'name': class_name,
-                'start_line': class_range.start.line,
-                'end_line': class_range.end.line,
-                'node': class_node,
-            }
-        except Exception:
-            return None
+        type_range = type_node.range()
+        # Look for struct types
+        type_spec_nodes = type_node.find_all(kind='type_spec')
+        for spec_node in type_spec_nodes:
+            name_node = spec_node.field('name')
+            type_field = spec_node.field('type')
+            if name_node and type_field and type_field.kind() == 'struct_type':
+                return AstDefinition(
+                    name_node.text(),
+                    type_range.start.line,
+                    type_range.end.line,
+                    type_node,
+                )
+        return None
 
     def _extract_call_name(self, call_node, language: str) -> Optional[str]:
         """Extract the function name from a call node."""
@@ -826,12 +723,12 @@ class AstGrepParser:
             if not func_field:
                 return None
 
-            # Handle different call patterns
-            if func_field.kind() == 'identifier':
+            # Handle different call patterns; kind() crosses into the native
+            # parser, so fetch it once
+            func_kind = func_field.kind()
+            if func_kind in ('identifier', 'field_identifier'):
                 return func_field.text()
-            elif func_field.kind() == 'field_identifier':
-                return func_field.text()
-            elif func_field.kind() in ('attribute', 'member_expression', 'selector_expression'):
+            elif func_kind in ('attribute', 'member_expression', 'selector_expression'):
                 # For method calls like obj.method()
                 # Extract object and attribute separately to avoid multi-line chains
                 call_name = self._extract_member_call_name(func_field, language)
@@ -842,8 +739,7 @@ class AstGrepParser:
                 # Remove excessive whitespace and newlines
                 if text:
                     # Replace multiple whitespace/newlines with single space
-                    import re
-                    text = re.sub(r'\s+', ' ', text).strip()
+                    text = _WHITESPACE_RE.sub(' ', text).strip()
                     # If still multi-line or very long, just get first part
                     if len(text) > 100:
                         return None
@@ -909,8 +805,7 @@ class AstGrepParser:
             # Fallback to text but clean it
             text = member_node.text()
             if text:
-                import re
-                text = re.sub(r'\s+', ' ', text).strip()
+                text = _WHITESPACE_RE.sub(' ', text).strip()
                 if len(text) > 100:
                     return None
                 return text
@@ -922,14 +817,14 @@ class AstGrepParser:
     def _get_root_object(self, obj_node, language: str) -> Optional[str]:
         """Extract the root object from a potentially chained expression."""
         try:
-            import re
+            obj_kind = obj_node.kind()
 
             # If it's a simple identifier or simple expression, use it
-            if obj_node.kind() in ('identifier', 'field_identifier'):
+            if obj_kind in ('identifier', 'field_identifier'):
                 return obj_node.text()
 
             # For call expressions, try to get the function being called
-            if obj_node.kind() == 'call':
+            if obj_kind == 'call':
                 func_field = obj_node.field('function')
                 if func_field:
                     # Recursively get the root
@@ -939,14 +834,14 @@ class AstGrepParser:
                     # If no root found, try to extract something simple
                     text = func_field.text()
                     if text:
-                        text = re.sub(r'\s+', ' ', text).strip()
+                        text = _WHITESPACE_RE.sub(' ', text).strip()
                         # Extract first part (before first dot or paren)
-                        match = re.match(r'^([a-zA-Z_][a-zA-Z0-9_]*(?:\.[a-zA-Z_][a-zA-Z0-9_]*)?)', text)
+                        match = _SIMPLE_NAME_RE.match(text)
                         if match:
                             return match.group(1)
 
             # For attribute/member expressions, get the root recursively
-            if obj_node.kind() == 'attribute':
+            if obj_kind == 'attribute':
                 obj_field = obj_node.field('object')
                 attr_field = obj_node.field('attribute')
                 if obj_field and attr_field:
@@ -959,7 +854,7 @@ class AstGrepParser:
                         return root
 
             # For member expressions (JS), get the root recursively
-            if obj_node.kind() == 'member_expression':
+            if obj_kind == 'member_expression':
                 obj_field = obj_node.field('object')
                 prop_field = obj_node.field('property')
                 if obj_field and prop_field:
@@ -970,7 +865,7 @@ class AstGrepParser:
                         return root
 
             # For selector expressions (Go), get the root recursively
-            if obj_node.kind() == 'selector_expression':
+            if obj_kind == 'selector_expression':
                 operand_field = obj_node.field('operand')
                 field_field = obj_node.field('field')
                 if operand_field and field_field:
@@ -983,7 +878,7 @@ class AstGrepParser:
             # Try to get simple text if it's short enough
             text = obj_node.text()
             if text:
-                text = re.sub(r'\s+', ' ', text).strip()
+                text = _WHITESPACE_RE.sub(' ', text).strip()
                 # Only use if reasonably short and simple
                 if len(text) <= 30 and '\n' not in text:
                     return text
@@ -993,207 +888,147 @@ class AstGrepParser:
             return None
 
     def find_function_at_line(
-        self, root: SgRoot, line_number: int, language: str
+        self, root: Union['SgRoot', 'SgNode'], line_number: int, language: str
     ) -> Optional[Dict[str, Any]]:
         """Find the function containing the specified line number.
 
         Args:
-            root: SgRoot object
+            root: SgRoot object, or its already unwrapped root node
             line_number: Line number to search for
             language: Programming language
 
         Returns:
             Function information dict or None if not found
         """
-        try:
-            node = root.root()
-        except Exception:
+        extractors = self.FUNCTION_EXTRACTORS.get(language)
+        if not extractors:
             return None
 
-        # Use the same logic as find_functions to get all functions and find the one containing the line
+        # Check kinds in the same order as find_functions. Each bucket is in
+        # document order, so nodes starting past the line cannot contain it.
         try:
-            if language == 'python':
-                func_nodes = node.find_all(kind='function_definition')
-                for func_node in func_nodes:
-                    func_range = func_node.range()
-                    if func_range.start.line <= line_number <= func_range.end.line:
-                        func_info = self._extract_python_function(func_node)
-                        if func_info:
-                            return func_info
-
-            elif language == 'go':
-                # Check function declarations
-                func_nodes = node.find_all(kind='function_declaration')
-                for func_node in func_nodes:
-                    func_range = func_node.range()
-                    if func_range.start.line <= line_number <= func_range.end.line:
-                        func_info = self._extract_go_function(func_node)
-                        if func_info:
-                            return func_info
-
-                # Check method declarations
-                method_nodes = node.find_all(kind='method_declaration')
-                for method_node in method_nodes:
-                    method_range = method_node.range()
-                    if method_range.start.line <= line_number <= method_range.end.line:
-                        func_info = self._extract_go_method(method_node)
-                        if func_info:
-                            return func_info
-
-            elif language in ('c', 'cpp'):
-                func_nodes = node.find_all(kind='function_definition')
-                for func_node in func_nodes:
-                    func_range = func_node.range()
-                    if func_range.start.line <= line_number <= func_range.end.line:
-                        func_info = self._extract_c_function(func_node, language)
-                        if func_info:
-                            return func_info
-
-            elif language == 'java':
-                # Check method declarations
-                method_nodes = node.find_all(kind='method_declaration')
-                for method_node in method_nodes:
-                    method_range = method_node.range()
-                    if method_range.start.line <= line_number <= method_range.end.line:
-                        func_info = self._extract_java_method(method_node)
-                        if func_info:
-                            return func_info
-
-                # Check constructor declarations
-                constructor_nodes = node.find_all(kind='constructor_declaration')
-                for constructor_node in constructor_nodes:
-                    constructor_range = constructor_node.range()
-                    if constructor_range.start.line <= line_number <= constructor_range.end.line:
-                        func_info = self._extract_java_constructor(constructor_node)
-                        if func_info:
-                            return func_info
-
-            elif language == 'php':
-                # Check function definitions
-                func_nodes = node.find_all(kind='function_definition')
-                for func_node in func_nodes:
-                    func_range = func_node.range()
-                    if func_range.start.line <= line_number <= func_range.end.line:
-                        func_info = self._extract_php_function(func_node)
-                        if func_info:
-                            return func_info
-
-                # Check method declarations
-                method_nodes = node.find_all(kind='method_declaration')
-                for method_node in method_nodes:
-                    method_range = method_node.range()
-                    if method_range.start.line <= line_number <= method_range.end.line:
-                        func_info = self._extract_php_method(method_node)
-                        if func_info:
-                            return func_info
-
-            elif language == 'csharp':
-                method_nodes = node.find_all(kind='method_declaration')
-                for method_node in method_nodes:
-                    method_range = method_node.range()
-                    if method_range.start.line <= line_number <= method_range.end.line:
-                        func_info = self._extract_csharp_method(method_node)
-                        if func_info:
-                            return func_info
-
-            elif language in ('javascript', 'typescript', 'tsx'):
-                # Check function declarations
-                func_nodes = node.find_all(kind='function_declaration')
-                for func_node in func_nodes:
+            nodes = self._collect_nodes_by_kind(
+                self._root_node(root), [kind for kind, _, _ in extractors]
+            )
+            for kind, extractor_name, extra_args in extractors:
+                extractor = getattr(self, extractor_name)
+                for func_node in nodes[kind]:
                     func_range = func_node.range()
-                    if func_range.start.line <= line_number <= func_range.end.line:
-                        func_info = self._extract_js_function(func_node)
-                        if func_info:
-                            return func_info
-
-                # Check method definitions
-                method_nodes = node.find_all(kind='method_definition')
-                for method_node in method_nodes:
-                    method_range = method_node.range()
-                    if method_range.start.line <= line_number <= method_range.end.line:
-                        func_info = self._extract_js_method(method_node)
-                        if func_info:
-                            return func_info
-
-                # Check arrow functions
-                arrow_nodes = node.find_all(kind='arrow_function')
-                for arrow_node in arrow_nodes:
-                    arrow_range = arrow_node.range()
-                    if arrow_range.start.line <= line_number <= arrow_range.end.line:
-                        func_info = self._extract_js_arrow_function(arrow_node)
+                    if func_range.start.line > line_number:
+                        break
+                    if line_number <= func_range.end.line:
+                        func_info = extractor(func_node, *extra_args)
                         if func_info:
-                            return func_info
-
+                            return func_info.to_dict()
         except Exception:
             # If any error occurs, return None
             pass
 
         return None
 
-    def find_imports(self, root: SgRoot, language: str) -> List[str]:
+    def find_imports(
+        self, root: Union['SgRoot', 'SgNode'], language: str
+    ) -> List[str]:
         """Find all import statements in the AST.
 
         Args:
-            root: SgRoot object
+            root: SgRoot object, or its already unwrapped root node
             language: Programming language
 
+        Returns:
+            List of import paths/names
+        """
+        extractors = self.IMPORT_EXTRACTORS.get(language, ())
+        nodes = self._collect_nodes_by_kind(
+            self._root_node(root), [kind for kind, _ in extractors]
+        )
+        return self._extract_imports(nodes, extractors)
+
+    def _extract_imports(
+        self, nodes: Dict[str, List[Any]], extractors: Tuple[Tuple[str, str], ...]
+    ) -> List[str]:
+        """Run import extractors over collected nodes of their kinds.
+
+        Args:
+            nodes: Nodes by kind, as from _collect_nodes_by_kind
+            extractors: (node kind, extractor method name) entries, as in
+                IMPORT_EXTRACTORS
+
         Returns:
             List of import paths/names
         """
         imports = []
-        node = root.root()
-
-        if language == 'python':
-            # Find import statements
-            import_nodes = node.find_all(kind='import_statement')
-            for import_node in import_nodes:
-                # Get dotted name
-                dotted_nodes = import_node.find_all(kind='dotted_name')
-                for dotted in dotted_nodes:
-                    imports.append(dotted.text())
-
-            # Find import_from statements
-            import_from_nodes = node.find_all(kind='import_from_statement')
-            for import_node in import_from_nodes:
-                dotted_nodes = import_node.find_all(kind='dotted_name')
-                for dotted in dotted_nodes:
-                    imports.append(dotted.text())
-
-        elif language in ('c', 'cpp'):
-            # Find #include directives
-            include_nodes = node.find_all(kind='preproc_include')
-            for include_node in include_nodes:
-                # Look for string literal or system_lib_string
-                children = include_node.children()
-                for child in children:
-                    if child.kind() == 'string_literal':
-                        imports.append(child.text().strip('"'))
-                    elif child.kind() == 'system_lib_string':
-                        imports.append(child.text().strip('<>'))
-
-        elif language == 'go':
-            # Find import declarations
-            import_nodes = node.find_all(kind='import_declaration')
-            for import_node in import_nodes:
-                # Find string literals
-                string_nodes = import_node.find_all(kind='interpreted_string_literal')
-                for string_node in string_nodes:
-                    imports.append(string_node.text().strip('"'))
-
-        elif language == 'java':
-            # Find import declarations
-            import_nodes = node.find_all(kind='import_declaration')
-            for import_node in import_nodes:
-                imports.append(import_node.text())
-
-        elif language in ('javascript', 'typescript', 'tsx'):
-            # Find import statements
-            import_nodes = node.find_all(kind='import_statement')
-            for import_node in import_nodes:
-                imports.append(import_node.text())
+        for kind, extractor_name in extractors:
+            extractor = getattr(self, extractor_name)
+            for import_node in nodes[kind]:
+                imports.extend(extractor(import_node))
 
         return imports
 
+    def _extract_dotted_imports(self, import_node) -> List[str]:
+        """Extract the dotted module names from a Python import statement."""
+        return [dotted.text() for dotted in import_node.find_all(kind='dotted_name')]
+
+    def _extract_include_imports(self, include_node) -> List[str]:
+        """Extract the included header from a C/C++ #include directive."""
+        headers = []
+        # Look for string literal or system_lib_string
+        for child in include_node.children():
+            child_kind = child.kind()
+            if child_kind == 'string_literal':
+                headers.append(child.text().strip('"'))
+            elif child_kind == 'system_lib_string':
+                headers.append(child.text().strip('<>'))
+        return headers
+
+    def _extract_go_imports(self, import_node) -> List[str]:
+        """Extract the package paths from a Go import declaration."""
+        return [
+            string_node.text().strip('"')
+            for string_node in import_node.find_all(kind='interpreted_string_literal')
+        ]
+
+    def _extract_import_text(self, import_node) -> List[str]:
+        """Use the whole import statement text, as for Java and JavaScript."""
+        return [import_node.text()]
+
+    def _ast_cache_path(self, content: str, language: str) -> Optional[Path]:
+        """Get the on-disk cache location for the AST data of the given source.
+
+        Args:
+            content: Source code content
+            language: Programming language
+
+        Returns:
+            Path of the cache entry or None if caching is disabled
+        """
+        if not self.cache_dir:
+            return None
+
+        digest = hashlib.sha256(
+            f"{self.AST_CACHE_VERSION}\0{language}\0".encode()
+            + content.encode('utf-8', errors='surrogatepass')
+        ).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def _may_contain_definitions(self, content: str, language: str) -> bool:
+        """Cheaply rule out large files that cannot contain any definitions.
+
+        Args:
+            content: Source code content
+            language: Programming language
+
+        Returns:
+            bool: False only if the file is large and has none of the language's
+                sentinel substrings, so parsing it would find nothing
+        """
+        if len(content) < self.SENTINEL_PREFILTER_MIN_SIZE:
+            return True
+        sentinels = self.DEFINITION_SENTINELS.get(language)
+        if not sentinels:
+            return True
+        return any(sentinel in content for sentinel in sentinels)
+
     def extract_comprehensive_ast_data(
         self, content: str, language: str
     ) -> Dict[str, Any]:
@@ -1206,30 +1041,65 @@ class AstGrepParser:
         Returns:
             Dictionary with AST data in the format expected by repo_tree
         """
+        cache_path = self._ast_cache_path(content, language)
+        if cache_path:
+            cached = load_json_cache(cache_path)
+            if cached is not None:
+                return cached
+
         ast_data = {"functions": {}, "classes": {}, "calls": [], "imports": []}
 
+        if not self._may_contain_definitions(content, language):
+            return ast_data
+
         root = self.parse_code(content, language)
         if not root:
             return ast_data
 
+        function_extractors = self.FUNCTION_EXTRACTORS.get(language, ())
+        class_extractors = self.CLASS_EXTRACTORS.get(language, ())
+        import_extractors = self.IMPORT_EXTRACTORS.get(language, ())
+        call_kinds = self.CALL_KINDS.get(language, ('call', 'call_expression'))
+
+        # Collect the nodes of every kind needed below in a single traversal
+        nodes = self._collect_nodes_by_kind(
+            root.root(),
+            dict.fromkeys(
+                [entry[0] for entry in function_extractors]
+                + [entry[0] for entry in class_extractors]
+                + [entry[0] for entry in import_extractors]
+                + list(call_kinds)
+            ),
+        )
+
         # Extract functions
-        functions = self.find_functions(root, language)
+        functions = self._extract_definitions(nodes, function_extractors)
+
+        # Each function takes the calls in its line range by bisection
+        call_sites = (
+            self._extract_call_sites(nodes, call_kinds, language) if functions else []
+        )
+
         for func_info in functions:
-            func_key = func_info['name']
-            if 'class' in func_info and func_info['class']:
-                func_key = f"{func_info['class']}.{func_info['name']}"
+            # Names recur across files (run, __init__, ...) and the repo map keeps
+            # them all alive, so intern them rather than store one copy per file
+            func_name = sys.intern(func_info.name)
+            class_name = func_info.class_name and sys.intern(func_info.class_name)
+            func_key = func_name
+            if class_name:
+                func_key = sys.intern(f"{class_name}.{func_name}")
 
             # Find function calls within this function
-            calls = self.find_function_calls(
-                root, language, func_info['start_line'], func_info['end_line']
+            calls = self._calls_in_range(
+                call_sites, func_info.start_line, func_info.end_line
             )
 
             ast_data["functions"][func_key] = {
-                "name": func_info['name'],
-                "start_line": func_info['start_line'],
-                "end_line": func_info['end_line'],
-                "class": func_info.get('class'),
-                "calls": list(calls),
+                "name": func_name,
+                "start_line": func_info.start_line,
+                "end_line": func_info.end_line,
+                "class": class_name,
+                "calls": calls,
                 "local_vars": {},  # Simplified for now
             }
 
@@ -1238,32 +1108,80 @@ class AstGrepParser:
                 ast_data["calls"].append(
                     {
                         "name": call,
-                        "line": func_info['start_line'],
+                        "line": func_info.start_line,
                         "caller": func_key,
-                        "class": func_info.get('class'),
+                        "class": class_name,
                     }
                 )
 
+        # Group methods by class in one pass over the functions
+        methods_by_class: Dict[str, List[str]] = defaultdict(list)
+        for func_data in ast_data["functions"].values():
+            if func_data["class"]:
+                methods_by_class[func_data["class"]].append(func_data["name"])
+
         # Extract classes
-        classes = self.find_classes(root, language)
+        classes = self._extract_definitions(nodes, class_extractors)
         for class_info in classes:
-            # Find methods for this class
-            methods = [
-                func_data["name"]
-                for func_key, func_data in ast_data["functions"].items()
-                if func_data.get("class") == class_info['name']
-            ]
-
-            ast_data["classes"][class_info['name']] = {
-                "name": class_info['name'],
+            methods = list(methods_by_class.get(class_info.name, ()))
+
+            ast_data["classes"][class_info.name] = {
+                "name": class_info.name,
                 "methods": methods,
                 "instance_vars": {},  # Simplified for now
                 "base_classes": [],  # Simplified for now
-                "start_line": class_info['start_line'],
-                "end_line": class_info['end_line'],
+                "start_line": class_info.start_line,
+                "end_line": class_info.end_line,
             }
 
         # Extract imports
-        ast_data["imports"] = self.find_imports(root, language)
+        ast_data["imports"] = self._extract_imports(nodes, import_extractors)
+
+        if cache_path:
+            store_json_cache(cache_path, ast_data)
 
         return ast_data
+
+    def extract_many(
+        self,
+        files: Iterable[Tuple[str, str, str]],
+        max_workers: Optional[int] = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Extract AST data for many files in parallel worker processes.
+
+        Args:
+            files: Iterable of (path, content, language) tuples
+            max_workers: Number of worker processes, defaults to the CPU count
+
+        Yields:
+            Tuples of file path and AST data, in input order
+        """
+        cache_dir = str(self.cache_dir) if self.cache_dir else None
+        file_infos = (
+            (path, content, language, cache_dir) for path, content, language in files
+        )
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # Large chunks amortise the pickling round-trip per task
+            yield from executor.map(_extract_file_worker, file_infos, chunksize=16)
+
+
+# Parser instances of a worker process, keyed by cache directory
+_worker_parsers: Dict[Optional[str], AstGrepParser] = {}
+
+
+def _extract_file_worker(
+    file_info: Tuple[str, str, str, Optional[str]]
+) -> Tuple[str, Dict[str, Any]]:
+    """Worker function for AstGrepParser.extract_many.
+
+    Args:
+        file_info: Tuple of path, content, language and cache directory
+
+    Returns:
+        Tuple of file path and AST data
+    """
+    path, content, language, cache_dir = file_info
+    parser = _worker_parsers.get(cache_dir)
+    if parser is None:
+        parser = _worker_parsers[cache_dir] = AstGrepParser(cache_dir)
+    return path, parser.extract_comprehensive_ast_data(content, language)
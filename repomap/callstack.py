@@ -2,11 +2,15 @@
 
 import json
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from .ast_grep_utils import AstGrepParser
 from .providers import get_provider
+from .utils import dumps_json
 
 
 class CallStackGenerator:
@@ -15,6 +19,12 @@ class CallStackGenerator:
     # For backward compatibility
     SUPPORTED_LANGUAGES = AstGrepParser.SUPPORTED_LANGUAGES
 
+    # Number of fetched files, and of parsed trees, kept for repeated lookups
+    FILE_CACHE_SIZE = 128
+
+    # Concurrent requests when prefetching the files of several functions
+    FETCH_WORKERS = 8
+
     def __init__(
         self,
         token: Optional[str] = None,
@@ -27,10 +37,34 @@ class CallStackGenerator:
         self.ast_grep = AstGrepParser()
         self.token = token
         self.provider = None  # Will be initialized when needed based on repo URL
+        # LRU caches so that looking up several functions in one file fetches and
+        # parses it only once; see refresh()
+        self._content_cache: OrderedDict[str, str] = OrderedDict()
+        self._parse_cache: OrderedDict[Tuple[str, str], Any] = OrderedDict()
+        # Guards the provider and the content cache, which prefetch threads share
+        self._fetch_lock = threading.Lock()
         # For backward compatibility with tests
         self.parsers = {'python': True, 'c': True, 'cpp': True, 'go': True, 'java': True, 'php': True, 'csharp': True, 'javascript': True}
         self.queries = {'python': True, 'c': True, 'cpp': True, 'go': True, 'java': True, 'php': True, 'csharp': True, 'javascript': True}
 
+    def refresh(self) -> None:
+        """Drop cached file contents and parse trees so they are fetched again."""
+        self._content_cache.clear()
+        self._parse_cache.clear()
+
+    def _cache_put(self, cache: OrderedDict, key: Any, value: Any) -> None:
+        """Store a value in one of the LRU caches, evicting the oldest entries.
+
+        Args:
+            cache: Cache to store into
+            key: Cache key
+            value: Value to store
+        """
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.FILE_CACHE_SIZE:
+            cache.popitem(last=False)
+
     def _get_file_content(self, file_url: str) -> Optional[str]:
         """Fetch file content from URL.
 
@@ -40,15 +74,71 @@ class CallStackGenerator:
         Returns:
             str: File content or None if failed
         """
+        with self._fetch_lock:
+            content = self._content_cache.get(file_url)
+            if content is not None:
+                self._content_cache.move_to_end(file_url)
+                return content
+
         try:
-            # Initialize provider if needed
-            if not self.provider:
-                self.provider = get_provider(file_url, self.token)
-            return self.provider.get_file_content(file_url)
+            with self._fetch_lock:
+                # Initialize provider if needed
+                if not self.provider:
+                    self.provider = get_provider(file_url, self.token)
+            content = self.provider.get_file_content(file_url)
         except Exception as e:
             print(f"Failed to fetch file content from {file_url}: {e}")
             return None
 
+        if content is not None:
+            with self._fetch_lock:
+                self._cache_put(self._content_cache, file_url, content)
+        return content
+
+    def _prefetch_file_contents(self, file_urls: List[str]) -> None:
+        """Fetch several files concurrently into the content cache.
+
+        Args:
+            file_urls: URLs of the files that are about to be read
+        """
+        with self._fetch_lock:
+            missing = [
+                url
+                for url in dict.fromkeys(file_urls)
+                if url not in self._content_cache
+            ]
+        # Only what fits in the cache; a single file is simply fetched on demand
+        missing = missing[: self.FILE_CACHE_SIZE]
+        if len(missing) < 2:
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.FETCH_WORKERS, len(missing))
+        ) as executor:
+            # Results land in the content cache; failures are retried on demand
+            list(executor.map(self._get_file_content, missing))
+
+    def _parse_code(self, content: str, lang: str) -> Optional[Any]:
+        """Parse source code, reusing the tree of a recent identical parse.
+
+        Args:
+            content: Source code content
+            lang: Programming language
+
+        Returns:
+            SgRoot: Parsed AST root or None if parsing failed
+        """
+        key = (lang, content)
+        root = self._parse_cache.get(key)
+        if root is not None:
+            self._parse_cache.move_to_end(key)
+            return root
+
+        root = self.ast_grep.parse_code(content, lang)
+        if root is not None:
+            self._cache_put(self._parse_cache, key, root)
+        return root
+
     def _detect_language(self, file_path: str) -> Optional[str]:
         """Detect programming language from file extension.
 
@@ -73,18 +163,39 @@ class CallStackGenerator:
         Returns:
             Tuple[str, int, int]: Function name, start line, end line or None if not found
         """
-        root = self.ast_grep.parse_code(content, lang)
-        if not root:
-            return None
-
-        func_info = self.ast_grep.find_function_at_line(root, line, lang)
+        func_info = self._find_function_info_at_line(content, lang, line)
         if func_info:
             return (func_info['name'], func_info['start_line'], func_info['end_line'])
 
         return None
 
+    def _find_function_info_at_line(
+        self, content: str, lang: str, line: int
+    ) -> Optional[Dict[str, Any]]:
+        """Find the function definition containing the specified line.
+
+        Args:
+            content: Source code content
+            lang: Programming language
+            line: Line number to find
+
+        Returns:
+            Dict[str, Any]: Function information including its AST 'node', or None
+                if not found
+        """
+        root = self._parse_code(content, lang)
+        if not root:
+            return None
+
+        return self.ast_grep.find_function_at_line(root, line, lang)
+
     def _find_function_calls(
-        self, content: str, lang: str, start_line: int, end_line: int
+        self,
+        content: str,
+        lang: str,
+        start_line: int,
+        end_line: int,
+        func_node: Optional[Any] = None,
     ) -> Set[str]:
         """Find all function calls within a line range.
 
@@ -93,15 +204,48 @@ class CallStackGenerator:
             lang: Programming language
             start_line: Start line number
             end_line: End line number
+            func_node: Optional already parsed function node; when given, only its
+                subtree is searched and the content is not parsed again
 
         Returns:
             Set[str]: Set of function names that are called
         """
-        root = self.ast_grep.parse_code(content, lang)
+        return set(
+            self._iter_function_calls(content, lang, start_line, end_line, func_node)
+        )
+
+    def _iter_function_calls(
+        self,
+        content: str,
+        lang: str,
+        start_line: int,
+        end_line: int,
+        func_node: Optional[Any] = None,
+    ) -> Iterator[str]:
+        """Yield the functions called within a line range.
+
+        Args:
+            content: Source code content
+            lang: Programming language
+            start_line: Start line number
+            end_line: End line number
+            func_node: Optional already parsed function node; when given, only its
+                subtree is searched and the content is not parsed again
+
+        Yields:
+            str: Unique names of the functions called, in source order
+        """
+        if func_node is not None:
+            yield from self.ast_grep.iter_function_calls(
+                func_node, lang, start_line, end_line
+            )
+            return
+
+        root = self._parse_code(content, lang)
         if not root:
-            return set()
+            return
 
-        return self.ast_grep.find_function_calls(root, lang, start_line, end_line)
+        yield from self.ast_grep.iter_function_calls(root, lang, start_line, end_line)
 
     def generate_call_stack(self, target_file: str, line_number: int) -> List[Dict]:
         """Generate call stack from a given line in a file.
@@ -122,16 +266,22 @@ class CallStackGenerator:
             raise ValueError(f"Failed to fetch content from {target_file}")
 
         # Find the function containing the target line
-        func_info = self._find_function_at_line(content, lang, line_number)
+        func_info = self._find_function_info_at_line(content, lang, line_number)
         if not func_info:
             raise ValueError(f"No function found at line {line_number}")
 
-        func_name, start_line, end_line = func_info
+        func_name = func_info['name']
 
-        # Find all function calls within this function
-        calls = self._find_function_calls(content, lang, start_line, end_line)
+        # Find all function calls within this function, searching only its subtree
+        calls = self._iter_function_calls(
+            content,
+            lang,
+            func_info['start_line'],
+            func_info['end_line'],
+            func_node=func_info['node'],
+        )
 
-        # Build the call stack
+        # Build the call stack, listing calls in source order
         call_stack = [
             {
                 'function': func_name,
@@ -151,7 +301,7 @@ class CallStackGenerator:
             output_file: Path to output file
         """
         with open(output_file, 'w') as f:
-            json.dump(call_stack, f, indent=2)
+            f.write(dumps_json(call_stack))
 
     def get_function_content_by_line(self, file_url: str, line_number: int) -> str:
         """Get the content of the function containing the specified line.
@@ -169,7 +319,7 @@ class CallStackGenerator:
         lang = self._detect_language(file_url)
         return self._get_function_content(file_url, lang, line_number=line_number)
 
-    def get_function_content_by_name(  # noqa: C901
+    def get_function_content_by_name(
         self,
         ast_tree: str | dict,
         function_name: str,
@@ -194,6 +344,57 @@ class CallStackGenerator:
         Raises:
             ValueError: If no function is found with the given name
         """
+        repo_tree = self._load_repo_tree(ast_tree)
+        found_functions = self._get_function_contents(
+            repo_tree, {function_name}, file_path
+        ).get(function_name)
+
+        if not found_functions:
+            if file_path is not None:
+                raise ValueError(
+                    f"No function found with name: {function_name} in file: {file_path}"
+                )
+            raise ValueError(f"No function found with name: {function_name}")
+
+        return found_functions
+
+    def get_function_contents_by_names(
+        self,
+        ast_tree: str | dict,
+        function_names: List[str],
+        file_path: Optional[str] = None,
+    ) -> Dict[str, Dict[str, str]]:
+        """Get the contents of several functions by name using the repository tree.
+        The repository tree is searched once for all names, and every file is
+        fetched and parsed once no matter how many of the functions it holds.
+
+        Args:
+            ast_tree: Path to the repository tree JSON file, Dictionary with repository tree itself
+            function_names: Names of the functions to find (without class prefix)
+            file_path: Optional file path to search in. If provided, only searches in that
+                      specific file. The path should match the key in the repo tree's files dict.
+
+        Returns:
+            Dict[str, Dict[str, str]]: Dictionary mapping each function name to the
+                                      same "file_path:class_or_global" -> content
+                                      mapping get_function_content_by_name returns.
+                                      Names that are not found are left out.
+        """
+        repo_tree = self._load_repo_tree(ast_tree)
+        return self._get_function_contents(repo_tree, set(function_names), file_path)
+
+    def _load_repo_tree(self, ast_tree: str | dict) -> Dict[str, Any]:
+        """Load and validate a repository tree.
+
+        Args:
+            ast_tree: Path to the repository tree JSON file, Dictionary with repository tree itself
+
+        Returns:
+            Dict[str, Any]: Repository tree
+
+        Raises:
+            ValueError: If the tree cannot be loaded or misses required metadata
+        """
         if isinstance(ast_tree, str):
             # Load repo tree
             try:
@@ -213,6 +414,29 @@ class CallStackGenerator:
         # Get ref from metadata
         if 'ref' not in repo_tree['metadata']:
             raise ValueError("Repository tree is missing ref in metadata")
+
+        return repo_tree
+
+    def _get_function_contents(  # noqa: C901
+        self,
+        repo_tree: Dict[str, Any],
+        function_names: Set[str],
+        file_path: Optional[str] = None,
+    ) -> Dict[str, Dict[str, str]]:
+        """Get the contents of all functions with the given names.
+
+        Args:
+            repo_tree: Validated repository tree
+            function_names: Names of the functions to find
+            file_path: Optional file path to search in
+
+        Returns:
+            Dict[str, Dict[str, str]]: Function name -> "file_path:class_or_global"
+                -> function content, for the names that were found
+
+        Raises:
+            ValueError: If file_path is not in the repository tree
+        """
         ref = repo_tree['metadata']['ref']
 
         # Determine which files to search
@@ -225,38 +449,38 @@ class CallStackGenerator:
             # Search in all files
             files_to_search = repo_tree['files']
 
-        # Search for function in selected files
-        found_functions = {}
+        # Search for functions in selected files
+        matches = []
         for current_file_path, file_data in files_to_search.items():
             if 'ast' not in file_data or 'functions' not in file_data['ast']:
                 continue
 
             functions = file_data['ast']['functions']
             for func_key, func_info in functions.items():
-                # Check if this function matches the name we're looking for
-                if func_info['name'] == function_name:
+                # Check if this function matches one of the names we're looking for
+                if func_info['name'] in function_names:
                     # Create file URL
                     file_url = (
                         f"{repo_tree['metadata']['url']}/-/blob/{ref}/{current_file_path}"
                     )
-                    lang = file_data['language']
-
-                    # Get function content
-                    content = self._get_function_content(
-                        file_url, lang, start_line=func_info['start_line']
+                    matches.append(
+                        (current_file_path, file_url, file_data['language'], func_info)
                     )
 
-                    # Use composite key: "file_path:class_or_global" for uniqueness
-                    class_name = func_info['class'] if func_info['class'] else 'global'
-                    key = f"{current_file_path}:{class_name}"
-                    found_functions[key] = content
+        # Fetch the files of all matches at once instead of one round-trip each
+        self._prefetch_file_contents([file_url for _, file_url, _, _ in matches])
 
-        if not found_functions:
-            if file_path is not None:
-                raise ValueError(
-                    f"No function found with name: {function_name} in file: {file_path}"
-                )
-            raise ValueError(f"No function found with name: {function_name}")
+        found_functions = {}
+        for current_file_path, file_url, lang, func_info in matches:
+            # Get function content
+            content = self._get_function_content(
+                file_url, lang, start_line=func_info['start_line']
+            )
+
+            # Use composite key: "file_path:class_or_global" for uniqueness
+            class_name = func_info['class'] if func_info['class'] else 'global'
+            key = f"{current_file_path}:{class_name}"
+            found_functions.setdefault(func_info['name'], {})[key] = content
 
         return found_functions
 
@@ -288,23 +512,52 @@ class CallStackGenerator:
         if not content:
             raise ValueError(f"Failed to fetch content from {file_url}")
 
-        # Get function start and end lines
+        # Locate the function definition
         if line_number is not None:
             # Find the function containing the target line
-            func_info = self._find_function_at_line(content, lang, line_number)
+            func_info = self._find_function_info_at_line(content, lang, line_number)
             if not func_info:
                 raise ValueError(f"No function found at line {line_number}")
-            func_name, start_line, end_line = func_info
         elif start_line is not None:
             # Use the provided start line and find the function there
-            func_info = self._find_function_at_line(content, lang, start_line)
+            func_info = self._find_function_info_at_line(content, lang, start_line)
             if not func_info:
                 raise ValueError(f"No function found at line {start_line}")
-            func_name, start_line, end_line = func_info
         else:
             raise ValueError("Either line_number or start_line must be provided")
 
-        # Get the function content by extracting the lines
+        return self._extract_function_lines(content, func_info)
+
+    @staticmethod
+    def _extract_function_lines(content: str, func_info: Dict[str, Any]) -> str:
+        """Cut the full lines spanned by a function out of the file content.
+
+        The slice is taken around the node's offsets so only the function itself
+        is copied; the whole file is split into lines only if the offsets do not
+        line up with the content.
+
+        Args:
+            content: Source code content
+            func_info: Function information including its AST 'node'
+
+        Returns:
+            str: Lines of the function joined with newlines
+        """
+        func_node = func_info.get('node')
+        try:
+            node_range = func_node.range()
+            start, end = node_range.start.index, node_range.end.index
+            text = func_node.text()
+        except Exception:
+            start = end = None
+
+        if start is not None and text and content.startswith(text, start):
+            line_start = content.rfind('\n', 0, start) + 1
+            line_end = content.find('\n', max(end - 1, start))
+            if line_end == -1:
+                line_end = len(content)
+            return '\n'.join(content[line_start:line_end].splitlines())
+
         lines = content.splitlines()
-        function_lines = lines[start_line : end_line + 1]
+        function_lines = lines[func_info['start_line'] : func_info['end_line'] + 1]
         return '\n'.join(function_lines)
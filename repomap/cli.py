@@ -1,29 +1,64 @@
 """Command-line interface for repository map generation."""
 
 import argparse
-import json
+import functools
+import importlib
 import logging
-import os
 import sys
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from repomap import __version__
-from repomap.callstack import CallStackGenerator
-from repomap.core import fetch_repo_structure
-from repomap.repo_tree import RepoTreeGenerator
-from repomap.utils import setup_logging, store_repo_map
+from repomap.utils import (
+    dumps_json,
+    setup_logging,
+    store_repo_map,
+    store_repo_map_ndjson,
+)
 
 logger = logging.getLogger(__name__)
 
+# Imported on first use: they pull in the provider clients, which --help,
+# --version and the commands that do not need them should not pay for
+_LAZY_IMPORTS = {
+    'CallStackGenerator': 'repomap.callstack',
+    'RepoTreeGenerator': 'repomap.repo_tree',
+    'fetch_repo_structure': 'repomap.core',
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the lazily loaded names of this module on first access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
 
-def parse_args(args=None) -> argparse.Namespace:  # noqa: C901
-    """Parse command line arguments.
+
+def _lazy(name: str) -> Any:
+    """Get a lazily imported name through the module, importing it if needed.
+
+    Global lookups inside this module do not fall back to the module's
+    __getattr__, so main() resolves these names through here.
 
     Args:
-        args: List of arguments to parse. If None, uses sys.argv[1:].
+        name: One of the names in _LAZY_IMPORTS
 
     Returns:
-        argparse.Namespace: Parsed command line arguments
+        Any: The imported object
+    """
+    return getattr(sys.modules[__name__], name)
+
+
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser.
+
+    The parser is built once and reused, since parse_args does not modify it.
+
+    Returns:
+        argparse.ArgumentParser: Parser for the CLI arguments
     """
     parser = argparse.ArgumentParser(
         description="Generate repository map from GitLab repository",
@@ -43,6 +78,14 @@ def parse_args(args=None) -> argparse.Namespace:  # noqa: C901
         "-o", "--output", help="Output file path", default="repomap.json"
     )
 
+    parser.add_argument(
+        "--format",
+        choices=["json", "ndjson"],
+        default="json",
+        help="Repository map output format; ndjson writes one file entry per "
+        "line, for very large repositories",
+    )
+
     parser.add_argument(
         "-v", "--verbose", help="Enable verbose logging", action="store_true"
     )
@@ -112,19 +155,35 @@ def parse_args(args=None) -> argparse.Namespace:  # noqa: C901
         "Used with --print-function-by-name to search only in a specific file.",
     )
 
+    return parser
+
+
+def parse_args(args=None) -> argparse.Namespace:  # noqa: C901
+    """Parse command line arguments.
+
+    Only parses and validates; the selected mode is stored as ``args.mode``
+    for main() to dispatch on.
+
+    Args:
+        args: List of arguments to parse. If None, uses sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: Parsed command line arguments
+    """
+    parser = _build_parser()
     args = parser.parse_args(args)
 
     # Validate arguments
     if args.print_function:
-        if not all([args.target_file, args.line]):
+        if not args.target_file or args.line is None:
             parser.error("--print-function requires --target-file and --line")
     elif args.print_function_by_name:
-        if not all([args.name, args.repo_tree_path]):
+        if not args.name or not args.repo_tree_path:
             parser.error(
                 "--print-function-by-name requires --name and --repo-tree-path"
             )
     elif args.call_stack:
-        if not all([args.target_file, args.line]):
+        if not args.target_file or args.line is None:
             parser.error("--call-stack requires --target-file and --line")
     if not args.repo_url and not (
         args.call_stack or args.print_function or args.print_function_by_name
@@ -133,10 +192,229 @@ def parse_args(args=None) -> argparse.Namespace:  # noqa: C901
             "repo_url is required when not using --call-stack or --print-function"
         )
 
+    # Mode handled by main(); the first matching flag wins
+    if args.repo_tree:
+        args.mode = 'repo_tree'
+    elif args.print_function:
+        args.mode = 'print_function'
+    elif args.print_function_by_name:
+        args.mode = 'print_function_by_name'
+    elif args.call_stack:
+        args.mode = 'call_stack'
+    else:
+        args.mode = 'repo_map'
+
     return args
 
 
-def main() -> Optional[int]:  # noqa: C901
+def _collect_file_entries(structure: Dict, ast_data: Dict) -> None:
+    """Add an entry for every file in a repository structure.
+
+    Walks the nested structure with an explicit stack of iterators instead
+    of recursion, so deep trees cannot hit the recursion limit; files are
+    visited in the same depth-first order.
+
+    Args:
+        structure: Nested repository structure
+        ast_data: Mapping of file path to file entry to fill in
+    """
+    if not isinstance(structure, dict):
+        return
+
+    stack = [("", iter(structure.items()))]
+    while stack:
+        current_path, items = stack[-1]
+        for name, item in items:
+            if not isinstance(item, dict):
+                continue
+            # Repository paths are always "/"-separated
+            path = f"{current_path}/{name}" if current_path else name
+            if item.get("type") == "blob":
+                # TODO: Fetch file content from GitLab
+                # For now, we'll just store the file info
+                ast_data[path] = {
+                    "path": path,
+                    "size": item.get("size", 0),
+                    "mode": item.get("mode", "100644"),
+                }
+            else:
+                # This is a directory: descend, then resume this one
+                stack.append((path, iter(item.items())))
+                break
+        else:
+            stack.pop()
+
+
+def _run_repo_tree(args: argparse.Namespace) -> int:
+    """Generate and save the repository AST tree.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        int: Exit code
+    """
+    use_local_clone = not args.no_local_clone
+    method_desc = "local cloning" if use_local_clone else "API"
+    logger.info(
+        "Generating repository AST tree for %s using %s", args.repo_url, method_desc
+    )
+    generator = _lazy('RepoTreeGenerator')(args.token, use_local_clone=use_local_clone)
+
+    # Check if existing repo-tree is up to date
+    if generator.is_repo_tree_up_to_date(args.repo_url, args.ref, args.output):
+        logger.info(
+            "Repository AST tree is up to date (no changes in commit hash). "
+            "Skipping generation."
+        )
+        logger.info("Existing tree at %s is current", args.output)
+        return 0
+
+    logger.info("Repository has changes, generating new AST tree...")
+    repo_tree = generator.generate_repo_tree(args.repo_url, args.ref)
+
+    # Save repository AST tree
+    generator.save_repo_tree(repo_tree, args.output)
+    logger.info("Repository AST tree saved to %s", args.output)
+    return 0
+
+
+def _run_print_function(args: argparse.Namespace) -> int:
+    """Print the content of the function at a line.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        int: Exit code
+    """
+    generator = _lazy('CallStackGenerator')(token=args.token)
+    try:
+        logger.info("Getting function content for %s:%s", args.target_file, args.line)
+        function_content = generator.get_function_content_by_line(
+            args.target_file, args.line
+        )
+    except ValueError as e:
+        error_msg = str(e)
+        logger.error(error_msg)
+        print(error_msg, file=sys.stderr)
+        return 1
+    print(function_content)
+    return 0
+
+
+def _run_print_function_by_name(args: argparse.Namespace) -> int:
+    """Print every implementation of a function found in a repository tree.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        int: Exit code
+    """
+    generator = _lazy('CallStackGenerator')(token=args.token)
+    try:
+        if args.file_path:
+            logger.info(
+                "Getting function content for %s in file %s", args.name, args.file_path
+            )
+        else:
+            logger.info("Getting function content for %s", args.name)
+        function_contents = generator.get_function_content_by_name(
+            args.repo_tree_path, args.name, file_path=args.file_path
+        )
+    except ValueError as e:
+        error_msg = str(e)
+        logger.error(error_msg)
+        print(error_msg, file=sys.stderr)
+        return 1
+
+    # Print each function implementation with its file and class context
+    # Key format is "file_path:class_or_global"
+    for key, content in function_contents.items():
+        # Parse the key to extract file path and class/global
+        if ':' in key:
+            file_part, class_part = key.rsplit(':', 1)
+        else:
+            # Fallback for legacy format (shouldn't happen with new code)
+            file_part = None
+            class_part = key
+
+        # Print location information
+        if file_part:
+            print(f"\nFile: {file_part}")
+
+        if class_part == 'global':
+            print("Global function:")
+        else:
+            print(f"In class {class_part}:")
+        print(content)
+    return 0
+
+
+def _run_call_stack(args: argparse.Namespace) -> int:
+    """Generate a call stack and save or print it.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        int: Exit code
+    """
+    logger.info("Generating call stack for %s:%s", args.target_file, args.line)
+    generator = _lazy('CallStackGenerator')(args.token)
+    call_stack = generator.generate_call_stack(args.target_file, args.line)
+
+    if args.output_stack:
+        generator.save_call_stack(call_stack, args.output_stack)
+        logger.info("Call stack saved to %s", args.output_stack)
+    else:
+        # Print to stdout if no output file specified
+        print(dumps_json(call_stack))
+    return 0
+
+
+def _run_repo_map(args: argparse.Namespace) -> int:
+    """Fetch the repository structure and store the repository map.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        int: Exit code
+    """
+    logger.info("Fetching repository structure from %s", args.repo_url)
+    repo_structure = _lazy('fetch_repo_structure')(args.repo_url, args.token)
+
+    # Process each file in the repository
+    repo_map = {
+        "metadata": {"url": args.repo_url, "version": __version__},
+        "structure": repo_structure,
+        "ast_data": {},
+    }
+
+    _collect_file_entries(repo_structure, repo_map["ast_data"])
+
+    # Store repository map
+    if args.format == "ndjson":
+        output_path = store_repo_map_ndjson(repo_map, args.output)
+    else:
+        output_path = store_repo_map(repo_map, args.output)
+    logger.info("Repository map saved to %s", output_path)
+    return 0
+
+
+# Handler for each mode set by parse_args()
+_DISPATCH = {
+    'repo_tree': _run_repo_tree,
+    'print_function': _run_print_function,
+    'print_function_by_name': _run_print_function_by_name,
+    'call_stack': _run_call_stack,
+    'repo_map': _run_repo_map,
+}
+
+
+def main() -> Optional[int]:
     """Main entry point for the CLI.
 
     Returns:
@@ -147,140 +425,7 @@ def main() -> Optional[int]:  # noqa: C901
 
         log_level = 'DEBUG' if args.verbose else 'INFO'
         setup_logging(log_level)
-        if args.repo_tree:
-            # Generate repository AST tree
-            use_local_clone = not args.no_local_clone
-            method_desc = "local cloning" if use_local_clone else "API"
-            logger.info(
-                f"Generating repository AST tree for {args.repo_url} using {method_desc}"
-            )
-            generator = RepoTreeGenerator(args.token, use_local_clone=use_local_clone)
-
-            # Check if existing repo-tree is up to date
-            if generator.is_repo_tree_up_to_date(args.repo_url, args.ref, args.output):
-                logger.info(
-                    f"Repository AST tree is up to date (no changes in commit hash). Skipping generation."
-                )
-                logger.info(f"Existing tree at {args.output} is current")
-                return 0
-
-            logger.info("Repository has changes, generating new AST tree...")
-            repo_tree = generator.generate_repo_tree(args.repo_url, args.ref)
-
-            # Save repository AST tree
-            generator.save_repo_tree(repo_tree, args.output)
-            logger.info(f"Repository AST tree saved to {args.output}")
-            return 0
-
-        elif args.print_function or args.print_function_by_name:
-            generator = CallStackGenerator(token=args.token)
-            try:
-                if args.print_function:
-                    # Print function content by line
-                    logger.info(
-                        f"Getting function content for {args.target_file}:{args.line}"
-                    )
-                    function_content = generator.get_function_content_by_line(
-                        args.target_file, args.line
-                    )
-                    print(function_content)
-                    return 0
-                else:
-                    # Print function content by name
-                    if args.file_path:
-                        logger.info(
-                            f"Getting function content for {args.name} "
-                            f"in file {args.file_path}"
-                        )
-                    else:
-                        logger.info(f"Getting function content for {args.name}")
-                    function_contents = generator.get_function_content_by_name(
-                        args.repo_tree_path, args.name, file_path=args.file_path
-                    )
-
-                    # Print each function implementation with its file and class context
-                    # Key format is "file_path:class_or_global"
-                    for key, content in function_contents.items():
-                        # Parse the key to extract file path and class/global
-                        if ':' in key:
-                            file_part, class_part = key.rsplit(':', 1)
-                        else:
-                            # Fallback for legacy format (shouldn't happen with new code)
-                            file_part = None
-                            class_part = key
-
-                        # Print location information
-                        if file_part:
-                            print(f"\nFile: {file_part}")
-
-                        if class_part == 'global':
-                            print("Global function:")
-                        else:
-                            print(f"In class {class_part}:")
-                        print(content)
-                    return 0
-            except ValueError as e:
-                error_msg = str(e)
-                logger.error(error_msg)
-                print(error_msg, file=sys.stderr)
-                return 1
-
-        elif args.call_stack:
-            # Generate call stack
-            logger.info(f"Generating call stack for {args.target_file}:{args.line}")
-            generator = CallStackGenerator(args.token)
-            call_stack = generator.generate_call_stack(args.target_file, args.line)
-
-            if args.output_stack:
-                generator.save_call_stack(call_stack, args.output_stack)
-                logger.info(f"Call stack saved to {args.output_stack}")
-            else:
-                # Print to stdout if no output file specified
-                print(json.dumps(call_stack, indent=2))
-            return 0
-
-        # Only fetch repository structure if not using print function commands
-        logger.info(f"Fetching repository structure from {args.repo_url}")
-        repo_structure = fetch_repo_structure(args.repo_url, args.token)
-
-        # Process each file in the repository
-        repo_map = {
-            "metadata": {"url": args.repo_url, "version": __version__},
-            "structure": repo_structure,
-            "ast_data": {},
-        }
-
-        def process_files(structure, current_path=""):
-            """Recursively process files in repository structure."""
-            if not isinstance(structure, dict):
-                return
-
-            for name, item in structure.items():
-                path = os.path.join(current_path, name)
-
-                if isinstance(item, dict):
-                    if "type" in item and item["type"] == "blob":
-                        try:
-                            # TODO: Fetch file content from GitLab
-                            # For now, we'll just store the file info
-                            repo_map["ast_data"][path] = {
-                                "path": path,
-                                "size": item.get("size", 0),
-                                "mode": item.get("mode", "100644"),
-                            }
-                        except Exception as e:
-                            logger.warning(f"Failed to process {path}: {e}")
-                    else:
-                        # This is a directory
-                        process_files(item, path)
-
-        process_files(repo_structure)
-
-        # Store repository map
-        output_path = store_repo_map(repo_map, args.output)
-        logger.info(f"Repository map saved to {output_path}")
-
-        return 0
+        return _DISPATCH[args.mode](args)
 
     except KeyboardInterrupt:
         logger.info("Operation cancelled by user")
@@ -289,7 +434,7 @@ def main() -> Optional[int]:  # noqa: C901
     except Exception as e:
         # Check if args is defined, otherwise use default verbose=False
         verbose = getattr(locals().get('args', None), 'verbose', False)
-        logger.error(f"Error: {e}", exc_info=verbose)
+        logger.error("Error: %s", e, exc_info=verbose)
         return 1
 
 
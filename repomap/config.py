@@ -1,24 +1,88 @@
 """Application configuration settings."""
 
+import os
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
 from dotenv import load_dotenv
-from pydantic import SecretStr
-from pydantic_settings import BaseSettings
 
 load_dotenv()
 
 
-class Settings(BaseSettings):
-    """Application settings."""
+class SecretStr:
+    """String value that is masked in reprs, str() and logs."""
+
+    __slots__ = ('_secret_value',)
+
+    def __init__(self, secret_value: str):
+        """Initialize the secret.
+
+        Args:
+            secret_value: Value to keep secret
+        """
+        self._secret_value = secret_value
+
+    def get_secret_value(self) -> str:
+        """Get the unmasked value.
+
+        Returns:
+            str: Secret value
+        """
+        return self._secret_value
+
+    def __len__(self) -> int:
+        return len(self._secret_value)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, SecretStr)
+            and self._secret_value == other._secret_value
+        )
+
+    def __hash__(self) -> int:
+        return hash(self._secret_value)
+
+    def __str__(self) -> str:
+        return '**********' if self._secret_value else ''
+
+    def __repr__(self) -> str:
+        return f"SecretStr('{self}')"
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Application settings.
+
+    Read from environment variables (names are case sensitive), with a .env
+    file in the working directory loaded into the environment first.
+    """
+
+    GITLAB_TOKEN: Optional[SecretStr] = None
+    GITHUB_TOKEN: Optional[SecretStr] = None
+    REPOMAP_CACHE_DIR: Optional[str] = None
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> 'Settings':
+        """Build settings from environment variables.
+
+        Args:
+            environ: Variables to read; defaults to os.environ
 
-    GITLAB_TOKEN: SecretStr | None = None
-    GITHUB_TOKEN: SecretStr | None = None
+        Returns:
+            Settings: Application settings
+        """
+        if environ is None:
+            environ = os.environ
 
-    class Config:
-        """Pydantic configuration."""
+        def secret(name: str) -> Optional[SecretStr]:
+            value = environ.get(name)
+            return SecretStr(value) if value is not None else None
 
-        case_sensitive = True
-        env_file = ".env"
-        extra = "ignore"
+        return cls(
+            GITLAB_TOKEN=secret('GITLAB_TOKEN'),
+            GITHUB_TOKEN=secret('GITHUB_TOKEN'),
+            REPOMAP_CACHE_DIR=environ.get('REPOMAP_CACHE_DIR'),
+        )
 
 
-settings = Settings()
+settings = Settings.from_env()
@@ -1,16 +1,59 @@
 """Core functionality for repository map generation."""
 
+import copy
+import hashlib
 import logging
-from typing import Dict, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
 
 from .providers import get_provider
 
 logger = logging.getLogger(__name__)
 
+# Repositories fetched at once by fetch_repo_structures()
+FETCH_WORKERS = 8
+
+# Structures fetched in this process, so repeated calls for the same
+# repository skip the paginated API round-trips; see clear_structure_cache()
+STRUCTURE_CACHE_SIZE = 8
+_structure_cache: OrderedDict[Tuple[str, Optional[bytes]], Dict] = OrderedDict()
+_structure_cache_lock = threading.Lock()
+
+
+def _structure_cache_key(
+    repo_url: str, token: Optional[str]
+) -> Tuple[str, Optional[bytes]]:
+    """Build the cache key for a repository and token.
+
+    The token is hashed so that it is not kept in memory in plain text.
+
+    Args:
+        repo_url: URL to the repository
+        token: Optional access token
+
+    Returns:
+        Tuple[str, Optional[bytes]]: Repository URL and token digest
+    """
+    token_digest = (
+        hashlib.blake2b(token.encode(), digest_size=16).digest() if token else None
+    )
+    return repo_url, token_digest
+
+
+def clear_structure_cache() -> None:
+    """Drop all cached repository structures so they are fetched again."""
+    with _structure_cache_lock:
+        _structure_cache.clear()
+
 
 def fetch_repo_structure(repo_url: str, token: Optional[str] = None) -> Dict:
     """Fetch repository structure.
 
+    Results are cached per repository URL and token for the lifetime of the
+    process; each call returns its own copy, so callers may modify it.
+
     Args:
         repo_url: URL to the repository
         token: Optional access token for authentication
@@ -18,5 +61,51 @@ def fetch_repo_structure(repo_url: str, token: Optional[str] = None) -> Dict:
     Returns:
         Dict: Repository structure
     """
+    key = _structure_cache_key(repo_url, token)
+    with _structure_cache_lock:
+        structure = _structure_cache.get(key)
+        if structure is not None:
+            _structure_cache.move_to_end(key)
+    if structure is not None:
+        logger.debug("Using cached repository structure for %s", repo_url)
+        return copy.deepcopy(structure)
+
     provider = get_provider(repo_url, token)
-    return provider.fetch_repo_structure(repo_url)
+    structure = provider.fetch_repo_structure(repo_url)
+
+    # Empty results are how some providers report failures; don't keep them
+    if structure:
+        with _structure_cache_lock:
+            _structure_cache[key] = copy.deepcopy(structure)
+            while len(_structure_cache) > STRUCTURE_CACHE_SIZE:
+                _structure_cache.popitem(last=False)
+    return structure
+
+
+def fetch_repo_structures(
+    repo_urls: Iterable[str],
+    token: Optional[str] = None,
+    max_workers: int = FETCH_WORKERS,
+) -> Dict[str, Dict]:
+    """Fetch the structures of several repositories concurrently.
+
+    Fetching is network bound, so the repositories are fetched on a thread
+    pool rather than one after another. Repeated URLs are fetched once.
+
+    Args:
+        repo_urls: URLs of the repositories
+        token: Optional access token used for every repository
+        max_workers: Maximum number of repositories fetched at the same time
+
+    Returns:
+        Dict[str, Dict]: Repository structure per URL, in the order given
+    """
+    repo_urls = list(dict.fromkeys(repo_urls))
+    if not repo_urls:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(repo_urls))) as executor:
+        structures = executor.map(
+            lambda repo_url: fetch_repo_structure(repo_url, token), repo_urls
+        )
+        return dict(zip(repo_urls, structures))
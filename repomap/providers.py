@@ -1,12 +1,18 @@
 """Module for repository provider abstractions and implementations."""
 
+import hashlib
 import logging
 import os
+import sys
 import tempfile
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Optional
-from urllib.parse import urlparse
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlparse
 
 import git
 import gitlab
@@ -14,10 +20,32 @@ from github import Github
 from github.Repository import Repository
 
 from .config import settings
+from .utils import load_json_cache, store_json_cache
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def _parse_repo_url(repo_url: str) -> tuple[str, str]:
+    """Split a repository URL into group path and project name.
+
+    Cached because the same repository URL is parsed on every provider call.
+
+    Args:
+        repo_url: Repository URL
+
+    Returns:
+        tuple[str, str]: Group path and project name
+    """
+    parsed = urlparse(repo_url)
+    path_parts = parsed.path.strip('/').split('/')
+    if len(path_parts) < 2:
+        raise ValueError(f"Invalid repository URL format: {repo_url}")
+    project_name = path_parts[-1]
+    group_path = '/'.join(path_parts[:-1])
+    return group_path, project_name
+
+
 class RepoProvider(ABC):
     """Abstract base class for repository providers."""
 
@@ -81,17 +109,34 @@ class RepoProvider(ABC):
 class GitLabProvider(RepoProvider):
     """GitLab repository provider implementation."""
 
-    def __init__(self, token: Optional[str] = None):
+    # Largest page size the repository tree API allows
+    TREE_PAGE_SIZE = 100
+    # Concurrent requests for the remaining pages of a repository tree
+    TREE_FETCH_WORKERS = 8
+    # Bump when the structure layout changes, so stale cached trees are not used
+    TREE_CACHE_VERSION = 1
+
+    def __init__(self, token: Optional[str] = None, cache_dir: Optional[str] = None):
         """Initialize GitLab provider.
 
         Args:
             token: Optional GitLab access token
+            cache_dir: Optional directory for the on-disk tree cache. Defaults to
+                the REPOMAP_CACHE_DIR setting; caching is disabled when neither
+                is set.
         """
         self.token = token or (
             settings.GITLAB_TOKEN.get_secret_value() if settings.GITLAB_TOKEN else None
         )
+        cache_dir = cache_dir or settings.REPOMAP_CACHE_DIR
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
         self.gl = None
         self.base_url = None
+        # Clients per base URL and projects per (base URL, project path), so
+        # repeated calls for one repository skip the project lookup round-trip
+        self._clients: Dict[str, gitlab.Gitlab] = {}
+        self._projects: Dict[Tuple[str, str], Any] = {}
+        self._cache_lock = threading.Lock()
 
     def _ensure_gitlab_client(self, repo_url: str):
         """Ensure GitLab client is initialized with correct base URL.
@@ -104,7 +149,57 @@ class GitLabProvider(RepoProvider):
             if not parsed.scheme or not parsed.netloc:
                 raise ValueError(f"Invalid repository URL: {repo_url}")
             self.base_url = f"{parsed.scheme}://{parsed.netloc}"
-            self.gl = gitlab.Gitlab(self.base_url, private_token=self.token)
+            self.gl = self._get_client(self.base_url)
+
+    def _get_client(self, base_url: str) -> gitlab.Gitlab:
+        """Get the GitLab client for a base URL, creating it on first use.
+
+        Args:
+            base_url: GitLab instance URL, e.g. https://gitlab.com
+
+        Returns:
+            gitlab.Gitlab: Client for the instance
+        """
+        with self._cache_lock:
+            client = self._clients.get(base_url)
+            if client is None:
+                # Concurrent page and file fetches make rate limiting (429)
+                # and transient 5xx responses likelier, so let the client
+                # retry those with backoff
+                client = gitlab.Gitlab(
+                    base_url, private_token=self.token, retry_transient_errors=True
+                )
+                self._clients[base_url] = client
+            return client
+
+    def _get_project(self, base_url: str, project_path: str) -> Any:
+        """Get a GitLab project, caching it per provider.
+
+        Args:
+            base_url: GitLab instance URL
+            project_path: Full project path, e.g. group/subgroup/project
+
+        Returns:
+            Any: GitLab project object
+
+        Raises:
+            gitlab.exceptions.GitlabGetError: If the project cannot be found
+        """
+        key = (base_url, project_path)
+        project = self._projects.get(key)
+        if project is not None:
+            return project
+
+        # Look up outside the lock, so a slow request does not hold up other
+        # threads; if two threads race, the first result is kept
+        gl = self._get_client(base_url)
+        try:
+            project = gl.projects.get(project_path)
+        except gitlab.exceptions.GitlabGetError:
+            encoded_path = quote(project_path, safe='')
+            project = gl.projects.get(encoded_path)
+        with self._cache_lock:
+            return self._projects.setdefault(key, project)
 
     def _get_project_parts(self, repo_url: str) -> tuple[str, str]:
         """Extract group path and project name from repository URL.
@@ -115,13 +210,7 @@ class GitLabProvider(RepoProvider):
         Returns:
             tuple[str, str]: Group path and project name
         """
-        parsed = urlparse(repo_url)
-        path_parts = parsed.path.strip('/').split('/')
-        if len(path_parts) < 2:
-            raise ValueError(f"Invalid repository URL format: {repo_url}")
-        project_name = path_parts[-1]
-        group_path = '/'.join(path_parts[:-1])
-        return group_path, project_name
+        return _parse_repo_url(repo_url)
 
     def get_file_content(self, file_url: str) -> Optional[str]:
         """Get content of a file from GitLab.
@@ -154,28 +243,24 @@ class GitLabProvider(RepoProvider):
             ref = file_parts[1]
             file_path = '/'.join(file_parts[2:])
 
-            gl = gitlab.Gitlab(base_url, private_token=self.token)
-
-            try:
-                project = gl.projects.get(project_path)
-            except gitlab.exceptions.GitlabGetError:
-                from urllib.parse import quote
-
-                encoded_path = quote(project_path, safe='')
-                project = gl.projects.get(encoded_path)
-
+            project = self._get_project(base_url, project_path)
             f = project.files.get(file_path=file_path, ref=ref)
             return f.decode().decode('utf-8')
         except Exception as e:
             logger.warning(f"Failed to fetch GitLab content: {e}")
             return None
 
-    def fetch_repo_structure(self, repo_url: str, ref: Optional[str] = None) -> Dict:
+    def fetch_repo_structure(
+        self, repo_url: str, ref: Optional[str] = None, walk_directories: bool = False
+    ) -> Dict:
         """Fetch repository structure from GitLab.
 
         Args:
             repo_url: URL to the repository
             ref: Optional git reference (branch, tag, commit)
+            walk_directories: List one directory per request instead of the
+                whole tree at once. Slower, but for very large repositories a
+                single recursive listing can time out on the server.
 
         Returns:
             Dict: Repository structure
@@ -184,42 +269,238 @@ class GitLabProvider(RepoProvider):
         group_path, project_name = self._get_project_parts(repo_url)
         project_path = f"{group_path}/{project_name}"
 
+        project = self._get_project(self.base_url, project_path)
+
+        if not ref:
+            ref = project.default_branch
+
+        cache_path = None
+        commit_sha = self._resolve_tree_commit(project, ref)
+        if commit_sha:
+            # List the resolved commit rather than the ref, so a branch moving
+            # mid-fetch can neither mix pages of two commits nor store another
+            # commit's tree under this key
+            ref = commit_sha
+            cache_path = self._tree_cache_path(project, commit_sha)
+            cached = load_json_cache(cache_path)
+            if cached is not None:
+                logger.debug("Using cached repository tree %s", cache_path)
+                return cached
+
+        # Items are nested as their pages arrive; the flat listing is never
+        # held in memory as a whole
+        if walk_directories:
+            items = self._iter_tree_items_by_directory(project, ref)
+        else:
+            items = self._iter_tree_items(project, ref)
+        structure = self._build_structure(items)
+        if cache_path and structure:
+            store_json_cache(cache_path, structure)
+        return structure
+
+    def _resolve_tree_commit(self, project: Any, ref: str) -> Optional[str]:
+        """Resolve a ref to its commit when the on-disk tree cache is enabled.
+
+        The tree of a commit never changes while a branch can move, so cache
+        entries are keyed by commit.
+
+        Args:
+            project: GitLab project object
+            ref: Git reference (branch, tag, commit)
+
+        Returns:
+            Commit SHA or None if caching is disabled or the ref cannot be
+            resolved
+        """
+        if not self.cache_dir:
+            return None
+
         try:
-            project = self.gl.projects.get(project_path)
+            return project.commits.get(ref).id
         except gitlab.exceptions.GitlabGetError:
-            from urllib.parse import quote
+            return None
 
-            encoded_path = quote(project_path, safe='')
-            project = self.gl.projects.get(encoded_path)
+    def _tree_cache_path(self, project: Any, commit_sha: str) -> Path:
+        """Get the on-disk cache location for the tree of a commit.
 
-        if not ref:
-            ref = project.default_branch
+        Args:
+            project: GitLab project object
+            commit_sha: Commit the tree was listed at
+
+        Returns:
+            Path of the cache entry
+        """
+        # Project ids are only unique within one GitLab instance
+        digest = hashlib.sha256(
+            f"{self.TREE_CACHE_VERSION}\0{self.base_url}\0{project.id}".encode()
+        ).hexdigest()
+        return self.cache_dir / 'trees' / digest[:16] / f"{commit_sha}.json"
+
+    @staticmethod
+    def _build_structure(items: Iterable[Dict]) -> Dict:
+        """Nest a flat repository tree listing into directories and entries.
+
+        Directory dicts are remembered by path, so each item needs a single
+        lookup of its parent instead of a walk down from the root. Names and
+        the few distinct type and mode values are interned, so the many
+        repeated ones (e.g. 'src', 'blob') share a single string object.
 
-        items = project.repository_tree(ref=ref, recursive=True, all=True)
+        Args:
+            items: Tree items with 'path', 'type', 'id' and optional 'mode'
+
+        Returns:
+            Dict: Repository structure
+        """
         structure = {}
+        dirs = {'': structure}
 
         for item in items:
             path = item['path']
-            parts = path.split('/')
-            current = structure
-
-            # Build tree structure
-            for i, part in enumerate(parts):
-                if i == len(parts) - 1:
-                    # File
-                    current[part] = {
-                        'type': item['type'],
-                        'mode': item.get('mode', '100644'),
-                        'id': item['id'],
-                    }
-                else:
-                    # Directory
-                    if part not in current:
-                        current[part] = {}
-                    current = current[part]
+            parent_path, _, name = path.rpartition('/')
+
+            current = dirs.get(parent_path)
+            if current is None:
+                # Directory not seen yet: create it and any missing parents
+                current = structure
+                prefix = ''
+                for part in parent_path.split('/'):
+                    prefix = f"{prefix}/{part}" if prefix else part
+                    node = dirs.get(prefix)
+                    if node is None:
+                        node = current.setdefault(sys.intern(part), {})
+                        dirs[prefix] = node
+                    current = node
+
+            if path in dirs:
+                # The entry replaces an existing dict, so forget what was
+                # remembered below it
+                subtree_prefix = f"{path}/"
+                for stale in [key for key in dirs if key.startswith(subtree_prefix)]:
+                    del dirs[stale]
+
+            entry = {
+                'type': sys.intern(item['type']),
+                'mode': sys.intern(item.get('mode', '100644')),
+                'id': item['id'],
+            }
+            current[sys.intern(name)] = entry
+            dirs[path] = entry
 
         return structure
 
+    def _iter_tree_items(self, project: Any, ref: str) -> Iterator[Dict]:
+        """Yield the flat, recursive listing of a repository tree page by page.
+
+        The first page reports how many pages there are, so the rest are
+        requested concurrently instead of following the next-page links one
+        at a time. GitLab leaves the total out for very large listings; those
+        are followed with keyset pagination instead, see
+        _iter_remaining_tree_items().
+
+        Args:
+            project: GitLab project object
+            ref: Git reference to list
+
+        Yields:
+            Dict: Tree items in the order GitLab lists them
+        """
+        pages = project.repository_tree(
+            ref=ref, recursive=True, iterator=True, per_page=self.TREE_PAGE_SIZE
+        )
+        total_pages = getattr(pages, 'total_pages', None)
+        if total_pages is None:
+            yield from self._iter_remaining_tree_items(project, ref, pages)
+            return
+        if total_pages <= 1:
+            yield from pages
+            return
+
+        per_page = pages.per_page or self.TREE_PAGE_SIZE
+        yield from islice(pages, per_page)
+
+        def fetch_page(page: int) -> List[Dict]:
+            return project.repository_tree(
+                ref=ref, recursive=True, page=page, per_page=per_page, get_all=False
+            )
+
+        workers = min(self.TREE_FETCH_WORKERS, total_pages - 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map() yields pages in order, so the listing order is unchanged
+            for page_items in executor.map(fetch_page, range(2, total_pages + 1)):
+                yield from page_items
+
+    def _iter_remaining_tree_items(
+        self, project: Any, ref: str, pages: Iterable[Dict]
+    ) -> Iterator[Dict]:
+        """Yield a tree listing of unknown length, one page after another.
+
+        Offset pages get slower the deeper into the listing they are, so after
+        the first page the listing continues with keyset pagination from the
+        last item seen. GitLab versions without keyset support for the tree
+        endpoint keep following the offset pages.
+
+        Args:
+            project: GitLab project object
+            ref: Git reference to list
+            pages: Lazy offset-paginated listing, not read from yet
+
+        Yields:
+            Dict: Tree items in the order GitLab lists them
+        """
+        per_page = getattr(pages, 'per_page', None) or self.TREE_PAGE_SIZE
+        first_page = list(islice(pages, per_page))
+        yield from first_page
+        if len(first_page) < per_page:
+            return
+
+        try:
+            rest = project.repository_tree(
+                ref=ref,
+                recursive=True,
+                iterator=True,
+                per_page=per_page,
+                pagination='keyset',
+                page_token=first_page[-1]['id'],
+            )
+        except gitlab.exceptions.GitlabGetError as e:
+            logger.debug("Keyset pagination not available, using page numbers: %s", e)
+            rest = pages
+        yield from rest
+
+    def _iter_tree_items_by_directory(self, project: Any, ref: str) -> Iterator[Dict]:
+        """Yield a repository tree listing one directory level at a time.
+
+        Every directory of a level is listed non-recursively and concurrently,
+        and the subdirectories found make up the next level.
+
+        Args:
+            project: GitLab project object
+            ref: Git reference to list
+
+        Yields:
+            Dict: Tree items, breadth first
+        """
+
+        def list_directory(path: str) -> List[Dict]:
+            return project.repository_tree(
+                path=path,
+                ref=ref,
+                recursive=False,
+                get_all=True,
+                per_page=self.TREE_PAGE_SIZE,
+            )
+
+        level = ['']
+        with ThreadPoolExecutor(max_workers=self.TREE_FETCH_WORKERS) as executor:
+            while level:
+                subdirectories = []
+                for items in executor.map(list_directory, level):
+                    for item in items:
+                        if item['type'] == 'tree':
+                            subdirectories.append(item['path'])
+                        yield item
+                level = subdirectories
+
     def validate_ref(self, repo_url: str, ref: Optional[str] = None) -> str:
         """Validate git reference and return default if not provided.
 
@@ -236,7 +517,7 @@ class GitLabProvider(RepoProvider):
         self._ensure_gitlab_client(repo_url)
         group_path, project_name = self._get_project_parts(repo_url)
         project_path = f"{group_path}/{project_name}"
-        project = self.gl.projects.get(project_path)
+        project = self._get_project(self.base_url, project_path)
 
         if ref:
             try:
@@ -270,7 +551,7 @@ class GitLabProvider(RepoProvider):
             self._ensure_gitlab_client(repo_url)
             group_path, project_name = self._get_project_parts(repo_url)
             project_path = f"{group_path}/{project_name}"
-            project = self.gl.projects.get(project_path)
+            project = self._get_project(self.base_url, project_path)
 
             if not ref:
                 ref = project.default_branch
@@ -717,29 +998,33 @@ class LocalRepoProvider(RepoProvider):
         Returns:
             Dict: Repository structure
         """
-        structure = {}
+        structure: Dict = {}
 
-        def scan_directory(current_path: Path, current_structure: Dict):
+        # Iterative os.scandir walk: DirEntry carries d_type from getdents, so
+        # is_dir()/is_file() need no extra stat and no Path objects are built
+        stack = [(os.fspath(root_path), structure)]
+        while stack:
+            current_path, current_structure = stack.pop()
             try:
-                for item in current_path.iterdir():
-                    # Skip .git directory and other hidden directories
-                    if item.name.startswith('.'):
-                        continue
-
-                    if item.is_file():
-                        current_structure[item.name] = {
-                            'type': 'blob',
-                            'mode': '100644',
-                            'id': '',  # We don't need git object IDs for our purposes
-                        }
-                    elif item.is_dir():
-                        current_structure[item.name] = {}
-                        scan_directory(item, current_structure[item.name])
+                with os.scandir(current_path) as entries:
+                    for entry in entries:
+                        # Skip .git directory and other hidden directories
+                        if entry.name.startswith('.'):
+                            continue
+
+                        if entry.is_file():
+                            current_structure[entry.name] = {
+                                'type': 'blob',
+                                'mode': '100644',
+                                'id': '',  # We don't need git object IDs for our purposes
+                            }
+                        elif entry.is_dir():
+                            current_structure[entry.name] = {}
+                            stack.append((entry.path, current_structure[entry.name]))
             except PermissionError:
                 # Skip directories we can't read
                 pass
 
-        scan_directory(root_path, structure)
         return structure
 
     def validate_ref(self, repo_url: str, ref: Optional[str] = None) -> str:
@@ -840,9 +1125,8 @@ class LocalRepoProvider(RepoProvider):
             provider = _get_api_provider(repo_url, self.token)
             return provider.validate_ref(repo_url, ref)
         except Exception as e:
-            if "No ref found" in str(e):
-                raise
-            # Fallback to API for validation
+            # Invalid refs were re-raised as ValueError above; fall back to
+            # API validation for anything else
             logger.warning(f"Failed to validate ref locally, falling back to API: {e}")
             provider = _get_api_provider(repo_url, self.token)
             return provider.validate_ref(repo_url, ref)
@@ -5,19 +5,25 @@ import logging
 import multiprocessing
 import os
 import queue
+import stat
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Queue
 from typing import Any, Dict, List, Optional, Tuple
 
 from .ast_grep_utils import AstGrepParser
 from .providers import get_provider
+from .utils import dumps_json
 
 logger = logging.getLogger(__name__)
 
 # Global parser instance for worker processes (initialized once per worker)
 _worker_parser = None
 
+# Number of concurrent file downloads when reading through the provider API
+_API_FETCH_WORKERS = 16
+
 
 def _get_worker_parser():
     """Get or create the parser instance for this worker process."""
@@ -64,7 +70,8 @@ class RepoTreeGenerator:
                 self.provider = get_provider(file_url, self.token, self.use_local_clone)
             return self.provider.get_file_content(file_url)
         except Exception as e:
-            logger.debug(f"Failed to fetch file content from {file_url}: {e}")
+            # Lazy %-formatting: per-file, and dropped at the default log level
+            logger.debug("Failed to fetch file content from %s: %s", file_url, e)
             return None
 
     def _detect_language(self, file_path: str) -> Optional[str]:
@@ -110,56 +117,57 @@ class RepoTreeGenerator:
         parser = _get_worker_parser()
 
         try:
-            start_time = time.time()
             lang = parser.detect_language(path)
             if not lang:
                 return path, None
 
-            content = None
             if use_local_clone and local_clone_path:
                 # Read from local filesystem (pre-cloned by main process)
-                from pathlib import Path
+                file_path = os.path.join(local_clone_path, path)
 
-                file_path = Path(local_clone_path) / path
-                if not file_path.exists() or not file_path.is_file():
+                # Open, fstat and read through the raw fd: a single fstat checks
+                # both the file type and the size, and no BufferedReader is built
+                try:
+                    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+                except OSError:
                     return path, None
-
-                # Check file size - skip very large files that might hang
                 try:
-                    file_size = file_path.stat().st_size
+                    file_stat = os.fstat(fd)
+                    if not stat.S_ISREG(file_stat.st_mode):
+                        return path, None
                     # Skip files larger than 5MB to prevent hanging
-                    if file_size > 5 * 1024 * 1024:
+                    if file_stat.st_size > 5 * 1024 * 1024:
                         # Don't log from workers - can cause deadlock
                         return path, None
+                    content_bytes = os.read(fd, file_stat.st_size)
                 except OSError:
                     return path, None
-
-                # Read file
-                try:
-                    with open(file_path, 'rb') as f:
-                        content_bytes = f.read()
-                    content = content_bytes.decode('utf-8', errors='ignore')
-                except (OSError, UnicodeDecodeError):
-                    return path, None
+                finally:
+                    os.close(fd)
             else:
                 # Without local clone, skip (API access from workers is not supported)
                 return path, None
 
             # Only skip truly empty files - process everything else
-            if not content:
+            if not content_bytes:
                 return path, None
 
+            # Run the cheap checks on raw bytes so rejected files are never decoded
             # Skip very long files (might have pathological structure)
-            line_count = content.count('\n')
+            line_count = content_bytes.count(b'\n')
             if line_count > 50000:  # Skip files with more than 50k lines
                 # Don't log from workers - can cause deadlock
                 return path, None
 
             # More permissive binary file check - only skip obvious binary files
-            null_count = content[:5000].count('\0')  # Check first 5KB
+            null_count = content_bytes[:5000].count(b'\0')  # Check first 5KB
             if null_count > 10:  # Allow some null bytes but skip obviously binary files
                 return path, None
 
+            content = content_bytes.decode('utf-8', errors='ignore')
+            if not content:
+                return path, None
+
             try:
                 # Use parser directly instead of creating a new RepoTreeGenerator
                 ast_data = parser.extract_comprehensive_ast_data(content, lang)
@@ -230,7 +238,8 @@ class RepoTreeGenerator:
 
         def collect_files(structure: Dict[str, Any], current_path: str = ""):
             for name, item in structure.items():
-                path = os.path.join(current_path, name)
+                # Repository paths are always "/"-separated
+                path = f"{current_path}/{name}" if current_path else name
                 if isinstance(item, dict):
                     if "type" in item and item["type"] == "blob":
                         files_to_process.append((path, item, repo_url, ref))
@@ -354,48 +363,63 @@ class RepoTreeGenerator:
 
                 logger.info(f"Completed: {parsed_count}/{len(files_to_process)} files successfully parsed, {skipped_count} skipped")
         else:
-            for path, item, repo_url, ref in files_to_process:
-                try:
-                    start_time = time.time()
-                    lang = self._detect_language(path)
-                    if lang:
-                        if self.use_local_clone and local_clone_path:
-                            # Read from local filesystem
-                            from pathlib import Path
-
-                            file_path = Path(local_clone_path) / path
-                            if file_path.exists() and file_path.is_file():
-                                content = file_path.read_text(
-                                    encoding='utf-8', errors='ignore'
-                                )
-                            else:
-                                continue
-                        else:
-                            # Use API method
-                            content = self._get_file_content(
-                                f"{repo_url}/-/blob/{ref}/{path}"
-                            )
+            # API reads are network-bound: submit them all up front so the
+            # requests overlap each other and the parsing below
+            fetch_executor = None
+            pending_fetches = {}
+            if not (self.use_local_clone and local_clone_path):
+                fetch_executor = ThreadPoolExecutor(max_workers=_API_FETCH_WORKERS)
+                pending_fetches = {
+                    path: fetch_executor.submit(
+                        self._get_file_content,
+                        f"{file_repo_url}/-/blob/{file_ref}/{path}",
+                    )
+                    for path, item, file_repo_url, file_ref in files_to_process
+                    if self._detect_language(path)
+                }
 
-                        if content:
-                            try:
-                                ast_data = self._parse_file_ast(content, lang)
-                                elapsed = time.time() - start_time
-                                if elapsed > 1:  # Log slow files
-                                    logger.info(
-                                        f"Parsed {path} ({lang}) in {elapsed:.2f}s"
+            try:
+                for path, item, repo_url, ref in files_to_process:
+                    try:
+                        start_time = time.perf_counter()
+                        lang = self._detect_language(path)
+                        if lang:
+                            if self.use_local_clone and local_clone_path:
+                                # Read from local filesystem
+                                file_path = os.path.join(local_clone_path, path)
+                                if not os.path.isfile(file_path):
+                                    continue
+                                with open(
+                                    file_path, encoding='utf-8', errors='ignore'
+                                ) as f:
+                                    content = f.read()
+                            else:
+                                # Use API method (already requested in background)
+                                content = pending_fetches[path].result()
+
+                            if content:
+                                try:
+                                    ast_data = self._parse_file_ast(content, lang)
+                                    elapsed = time.perf_counter() - start_time
+                                    if elapsed > 1:  # Log slow files
+                                        logger.info(
+                                            f"Parsed {path} ({lang}) in {elapsed:.2f}s"
+                                        )
+                                    repo_tree["files"][path] = {
+                                        "language": lang,
+                                        "ast": ast_data,
+                                    }
+                                except Exception as e:
+                                    logger.error(
+                                        f"AST parsing error for {path} ({lang}): {e}"
                                     )
-                                repo_tree["files"][path] = {
-                                    "language": lang,
-                                    "ast": ast_data,
-                                }
-                            except Exception as e:
-                                logger.error(
-                                    f"AST parsing error for {path} ({lang}): {e}"
-                                )
-                                continue
-                except Exception as e:
-                    logger.error(f"Error processing {path}: {e}")
-                    continue
+                                    continue
+                    except Exception as e:
+                        logger.error(f"Error processing {path}: {e}")
+                        continue
+            finally:
+                if fetch_executor:
+                    fetch_executor.shutdown(cancel_futures=True)
 
         # Cleanup temporary clones if using LocalRepoProvider
         if hasattr(self.provider, 'cleanup'):
@@ -517,4 +541,4 @@ class RepoTreeGenerator:
             output_path: Path to output file
         """
         with open(output_path, 'w') as f:
-            json.dump(repo_tree, f, indent=2)
+            f.write(dumps_json(repo_tree))
@@ -2,12 +2,47 @@
 
 import json
 import logging
+import os
+import tempfile
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+def dumps_json(data: Any, ensure_ascii: bool = True) -> str:
+    """Serialize data as JSON indented by two spaces.
+
+    Produces the same text as json.dumps(data, indent=2) but encodes with
+    orjson when it is installed, which is much faster for large repository
+    maps. Falls back to the json module for data orjson cannot encode, and
+    for non-ASCII output when ensure_ascii asks for escapes orjson does not
+    write.
+
+    Args:
+        data: JSON-serializable data
+        ensure_ascii: Whether non-ASCII characters must be escaped
+
+    Returns:
+        str: JSON text
+    """
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(
+                data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            )
+        except TypeError:
+            encoded = None
+        if encoded is not None and (not ensure_ascii or encoded.isascii()):
+            return encoded.decode('utf-8')
+    return json.dumps(data, indent=2, ensure_ascii=ensure_ascii)
+
+
 def store_repo_map(repo_map: Dict, output_path: Optional[str] = None) -> str:
     """Store repository map to a JSON file.
 
@@ -29,7 +64,67 @@ def store_repo_map(repo_map: Dict, output_path: Optional[str] = None) -> str:
         output_file.parent.mkdir(parents=True, exist_ok=True)
 
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(repo_map, f, indent=2, ensure_ascii=False)
+            f.write(dumps_json(repo_map, ensure_ascii=False))
+
+        logger.info(f"Repository map saved to {output_path}")
+        return str(output_file)
+
+    except IOError as e:
+        logger.error(f"Failed to write repository map: {e}")
+        raise
+
+
+def _dumps_json_line(data: Any) -> str:
+    """Serialize data as compact, single-line JSON.
+
+    Args:
+        data: JSON-serializable data
+
+    Returns:
+        str: JSON text without newlines
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def store_repo_map_ndjson(repo_map: Dict, output_path: Optional[str] = None) -> str:
+    """Store repository map as newline-delimited JSON.
+
+    The first line holds the metadata and structure, tagged with
+    "schema": "ndjson-v1"; every following line is a single-key object
+    mapping one file path to its ast_data entry. Entries are written one at a
+    time, so the whole map is never serialized into one string.
+
+    Args:
+        repo_map (Dict): Repository map data to store
+        output_path (Optional[str]): Path to output file. If None, uses default
+            'repomap.ndjson'
+
+    Returns:
+        str: Path to the stored file
+
+    Raises:
+        IOError: If file cannot be written
+    """
+    if not output_path:
+        output_path = 'repomap.ndjson'
+
+    try:
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        header = {key: value for key, value in repo_map.items() if key != 'ast_data'}
+        header['schema'] = 'ndjson-v1'
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(_dumps_json_line(header))
+            f.write('\n')
+            for path, entry in repo_map.get('ast_data', {}).items():
+                f.write(_dumps_json_line({path: entry}))
+                f.write('\n')
 
         logger.info(f"Repository map saved to {output_path}")
         return str(output_file)
@@ -66,6 +161,46 @@ def load_repo_map(file_path: str) -> Optional[Dict]:
         raise
 
 
+def load_json_cache(cache_path: Path) -> Optional[Any]:
+    """Load an entry of an on-disk JSON cache.
+
+    Args:
+        cache_path: Path of the cache entry
+
+    Returns:
+        Optional[Any]: Cached data or None on a cache miss
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_json_cache(cache_path: Path, data: Any) -> None:
+    """Atomically write an entry of an on-disk JSON cache.
+
+    Write errors are ignored: the caches are an optimisation only and must
+    never make the operation they speed up fail.
+
+    Args:
+        cache_path: Path of the cache entry
+        data: JSON-serializable data to store
+    """
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
 def setup_logging(level: str = 'INFO') -> None:
     """Configure logging for the application.
 
@@ -32,7 +32,7 @@ setup(
         "python-gitlab>=4.4.0",
         "pygithub>=2.5.0",
         "python-dotenv>=1.0.1",
-        "pydantic-settings>=2.7.1",
+        "pydantic>=2.7.0",
         "setuptools>=75.8.0",
         "tree-sitter-languages>=1.10.2",
         "tree-sitter>=0.21.3",
@@ -0,0 +1,238 @@
+"""Tests for the ast-grep parser wrapper."""
+
+import logging
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from repomap.ast_grep_utils import AstDefinition, AstGrepParser
+
+
+@pytest.fixture
+def python_content():
+    """Python source with a class, methods and calls."""
+    return """
+import os
+from pathlib import Path
+
+def helper():
+    return os.getcwd()
+
+class Worker:
+    def run(self):
+        helper()
+        self.stop()
+
+    def stop(self):
+        print("stopped")
+"""
+
+
+def test_ast_cache_disabled_by_default(python_content):
+    """Test that no cache directory is used unless configured."""
+    parser = AstGrepParser()
+    assert parser.cache_dir is None
+    assert parser._ast_cache_path(python_content, 'python') is None
+
+
+def test_ast_cache_round_trip(python_content, tmp_path):
+    """Test that a second extraction is served from the on-disk cache."""
+    parser = AstGrepParser(cache_dir=str(tmp_path))
+    ast_data = parser.extract_comprehensive_ast_data(python_content, 'python')
+
+    assert "Worker.run" in ast_data["functions"]
+    assert len(list(tmp_path.rglob("*.json"))) == 1
+
+    # A warm run must not parse the source again
+    with patch.object(parser, 'parse_code', side_effect=AssertionError):
+        cached = parser.extract_comprehensive_ast_data(python_content, 'python')
+
+    assert cached == ast_data
+
+
+def test_ast_cache_key_depends_on_content_and_language(python_content, tmp_path):
+    """Test that different sources or languages get different cache entries."""
+    parser = AstGrepParser(cache_dir=str(tmp_path))
+
+    path = parser._ast_cache_path(python_content, 'python')
+    assert path != parser._ast_cache_path(python_content + "\n", 'python')
+    assert path != parser._ast_cache_path(python_content, 'javascript')
+
+
+def test_ast_cache_ignores_corrupt_entries(python_content, tmp_path):
+    """Test that an unreadable cache entry falls back to parsing."""
+    parser = AstGrepParser(cache_dir=str(tmp_path))
+    cache_path = parser._ast_cache_path(python_content, 'python')
+    cache_path.parent.mkdir(parents=True)
+    cache_path.write_text("{not json")
+
+    ast_data = parser.extract_comprehensive_ast_data(python_content, 'python')
+
+    assert "helper" in ast_data["functions"]
+
+
+def test_extract_many_matches_serial_extraction(python_content):
+    """Test that parallel extraction returns the same data as serial extraction."""
+    parser = AstGrepParser()
+    files = [
+        (
+            f"pkg/module_{i}.py",
+            python_content + f"\ndef extra_{i}():\n    pass\n",
+            'python',
+        )
+        for i in range(5)
+    ]
+
+    results = list(parser.extract_many(files, max_workers=2))
+
+    assert [path for path, _ in results] == [path for path, _, _ in files]
+    for (path, content, language), (_, ast_data) in zip(files, results):
+        assert ast_data == parser.extract_comprehensive_ast_data(content, language)
+
+
+@pytest.mark.parametrize(
+    'file_path, language',
+    [
+        ('src/main.py', 'python'),
+        ('include/Vector.HPP', 'cpp'),
+        ('web/App.tsx', 'tsx'),
+        ('lib.d/README', None),
+        ('config/.py', None),
+        ('archive.tar.gz', None),
+    ],
+)
+def test_detect_language(file_path, language):
+    parser = AstGrepParser()
+    assert parser.detect_language(file_path) == language
+
+
+def test_find_functions_returns_definitions(python_content):
+    """Test that definitions carry their enclosing class."""
+    parser = AstGrepParser()
+    root = parser.parse_code(python_content, 'python')
+
+    functions = parser.find_functions(root, 'python')
+
+    assert all(isinstance(func, AstDefinition) for func in functions)
+    assert {(func.name, func.class_name) for func in functions} == {
+        ('helper', None),
+        ('run', 'Worker'),
+        ('stop', 'Worker'),
+    }
+
+
+def test_find_function_at_line_returns_dict(python_content):
+    """Test that find_function_at_line keeps its dictionary result."""
+    parser = AstGrepParser()
+    root = parser.parse_code(python_content, 'python')
+
+    func_info = parser.find_function_at_line(root, 9, 'python')
+
+    assert func_info['name'] == 'run'
+    assert func_info['class'] == 'Worker'
+    assert func_info['start_line'] <= 9 <= func_info['end_line']
+
+
+def test_find_function_at_line_outside_functions(python_content):
+    """Test that lines before or after every function find nothing."""
+    parser = AstGrepParser()
+    root = parser.parse_code(python_content, 'python')
+
+    assert parser.find_function_at_line(root, 1, 'python') is None
+    assert parser.find_function_at_line(root, 1000, 'python') is None
+
+
+def test_function_calls_keep_source_order(python_content):
+    """Test that each function lists its calls once, in source order."""
+    content = python_content + """
+    def again(self):
+        self.stop()
+        self.stop()
+"""
+    parser = AstGrepParser()
+    ast_data = parser.extract_comprehensive_ast_data(content, 'python')
+
+    assert ast_data['functions']['Worker.run']['calls'] == ['helper', 'self.stop']
+    assert ast_data['functions']['Worker.again']['calls'] == ['self.stop']
+
+
+def test_finders_accept_root_node(python_content):
+    """Test that the finders take an unwrapped root node as well as an SgRoot."""
+    parser = AstGrepParser()
+    root = parser.parse_code(python_content, 'python')
+    root_node = root.root()
+
+    assert [func.name for func in parser.find_functions(root_node, 'python')] == [
+        func.name for func in parser.find_functions(root, 'python')
+    ]
+    assert parser.find_imports(root_node, 'python') == parser.find_imports(
+        root, 'python'
+    )
+    assert parser.find_function_calls(root_node, 'python', 0, 20) == (
+        parser.find_function_calls(root, 'python', 0, 20)
+    )
+
+
+def test_function_calls_in_function_subtree(python_content):
+    """Test that searching a function's own node matches a range search."""
+    parser = AstGrepParser()
+    root = parser.parse_code(python_content, 'python')
+    func_info = parser.find_function_at_line(root, 9, 'python')
+    start_line, end_line = func_info['start_line'], func_info['end_line']
+
+    assert parser.find_function_calls(
+        func_info['node'], 'python', start_line, end_line
+    ) == parser.find_function_calls(root, 'python', start_line, end_line)
+    assert parser.find_function_calls(
+        func_info['node'], 'python', start_line, end_line
+    ) == {'helper', 'self.stop'}
+
+
+def test_large_file_without_definitions_is_not_parsed():
+    """Test that large data-only files skip parsing entirely."""
+    parser = AstGrepParser()
+    content = '# ' + '0123456789' * 20000 + '\n'
+    assert len(content) > parser.SENTINEL_PREFILTER_MIN_SIZE
+
+    with patch.object(parser, 'parse_code') as mock_parse:
+        ast_data = parser.extract_comprehensive_ast_data(content, 'python')
+
+    mock_parse.assert_not_called()
+    assert ast_data == {"functions": {}, "classes": {}, "calls": [], "imports": []}
+
+
+def test_large_file_with_late_definition_is_parsed():
+    """Test that a definition past the start of a large file is still found."""
+    parser = AstGrepParser()
+    content = '# ' + '0123456789' * 20000 + '\n\ndef tail():\n    pass\n'
+
+    ast_data = parser.extract_comprehensive_ast_data(content, 'python')
+
+    assert 'tail' in ast_data['functions']
+
+
+def test_parse_failure_is_logged_not_printed(capsys, caplog):
+    """Test that parse failures go to the debug log instead of stdout."""
+    parser = AstGrepParser()
+
+    with patch.object(AstGrepParser, '_SgRoot', side_effect=ValueError('boom')):
+        with caplog.at_level(logging.DEBUG, logger='repomap.ast_grep_utils'):
+            assert parser.parse_code('def f(): pass', 'python') is None
+
+    assert capsys.readouterr().out == ''
+    assert 'Failed to parse code with ast-grep for language python' in caplog.text
+
+
+def test_ast_grep_is_imported_lazily():
+    """Test that importing the module does not load the ast-grep extension."""
+    code = (
+        "import sys\n"
+        "import repomap.ast_grep_utils\n"
+        "assert 'ast_grep_py' not in sys.modules\n"
+        "parser = repomap.ast_grep_utils.AstGrepParser()\n"
+        "assert parser.detect_language('main.py') == 'python'\n"
+        "assert 'ast_grep_py' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -317,6 +317,169 @@ def test_generate_call_stack_minimal(mock_gitlab):
     assert 'helper' in call_stack[0]['calls']
 
 
+def test_generate_call_stack_parses_once(python_generator):
+    """Test that calls are found in the located function without reparsing."""
+    url = "https://example.com/group/project/-/blob/main/src/file.py"
+    parse_code = python_generator.ast_grep.parse_code
+
+    with patch.object(
+        python_generator, '_get_file_content', return_value=SAMPLE_PYTHON_CONTENT
+    ), patch.object(
+        python_generator.ast_grep, 'parse_code', side_effect=parse_code
+    ) as mock_parse:
+        call_stack = python_generator.generate_call_stack(url, 7)
+
+    assert mock_parse.call_count == 1
+    assert call_stack[0]['function'] == 'main'
+    assert set(call_stack[0]['calls']) == {'helper', 'print'}
+
+
+def test_function_calls_stream_in_source_order(python_generator):
+    """Test that calls are yielded lazily and reported in source order."""
+    url = "https://example.com/group/project/-/blob/main/src/file.py"
+    calls = python_generator._iter_function_calls(SAMPLE_PYTHON_CONTENT, 'python', 5, 8)
+
+    assert next(calls) == 'helper'
+    assert list(calls) == ['print']
+    with patch.object(
+        python_generator, '_get_file_content', return_value=SAMPLE_PYTHON_CONTENT
+    ):
+        call_stack = python_generator.generate_call_stack(url, 7)
+    assert call_stack[0]['calls'] == ['helper', 'print']
+
+
+def test_repeated_lookups_fetch_and_parse_once(python_generator):
+    """Test that functions of one file are served from the file and tree caches."""
+    url = "https://example.com/group/project/-/blob/main/src/file.py"
+    python_generator.provider = Mock()
+    python_generator.provider.get_file_content.return_value = SAMPLE_PYTHON_CONTENT
+    parse_code = python_generator.ast_grep.parse_code
+
+    with patch.object(
+        python_generator.ast_grep, 'parse_code', side_effect=parse_code
+    ) as mock_parse:
+        helper = python_generator.get_function_content_by_line(url, 2)
+        main = python_generator.get_function_content_by_line(url, 7)
+
+    assert helper.startswith('def helper():')
+    assert main.startswith('def main():')
+    python_generator.provider.get_file_content.assert_called_once_with(url)
+    assert mock_parse.call_count == 1
+
+    python_generator.refresh()
+    python_generator.get_function_content_by_line(url, 7)
+    assert python_generator.provider.get_file_content.call_count == 2
+
+
+def test_get_function_content_by_name_prefetches_files(python_generator):
+    """Test that the files of all matches are fetched once each, up front."""
+    files = {
+        f"pkg{i}/main.py": {
+            'language': 'python',
+            'ast': {
+                'functions': {
+                    'main': {'name': 'main', 'class': None, 'start_line': 5}
+                }
+            },
+        }
+        for i in range(3)
+    }
+    repo_tree = {
+        'metadata': {'url': 'https://example.com/group/project', 'ref': 'main'},
+        'files': files,
+    }
+    python_generator.provider = Mock()
+    python_generator.provider.get_file_content.return_value = SAMPLE_PYTHON_CONTENT
+
+    result = python_generator.get_function_content_by_name(repo_tree, 'main')
+
+    assert set(result) == {f"pkg{i}/main.py:global" for i in range(3)}
+    assert all(content.startswith('def main():') for content in result.values())
+    fetched = sorted(
+        call.args[0]
+        for call in python_generator.provider.get_file_content.call_args_list
+    )
+    assert fetched == [
+        f"https://example.com/group/project/-/blob/main/pkg{i}/main.py"
+        for i in range(3)
+    ]
+
+
+def test_get_function_contents_by_names_uses_each_file_once(python_generator):
+    """Test that several names from one file share one fetch and one parse."""
+    repo_tree = {
+        'metadata': {'url': 'https://example.com/group/project', 'ref': 'main'},
+        'files': {
+            'src/main.py': {
+                'language': 'python',
+                'ast': {
+                    'functions': {
+                        'helper': {'name': 'helper', 'class': None, 'start_line': 1},
+                        'main': {'name': 'main', 'class': None, 'start_line': 5},
+                    }
+                },
+            }
+        },
+    }
+    python_generator.provider = Mock()
+    python_generator.provider.get_file_content.return_value = SAMPLE_PYTHON_CONTENT
+
+    with patch.object(
+        python_generator.ast_grep,
+        'parse_code',
+        wraps=python_generator.ast_grep.parse_code,
+    ) as parse_code:
+        result = python_generator.get_function_contents_by_names(
+            repo_tree, ['helper', 'main', 'missing']
+        )
+
+    assert set(result) == {'helper', 'main'}
+    assert result['helper']['src/main.py:global'].startswith('def helper():')
+    assert result['main']['src/main.py:global'].startswith('def main():')
+    assert python_generator.provider.get_file_content.call_count == 1
+    assert parse_code.call_count == 1
+
+
+def _function_node(text, start, end):
+    """Build a mock AST node spanning content[start:end]."""
+    node = Mock()
+    node.text.return_value = text
+    node.range.return_value.start.index = start
+    node.range.return_value.end.index = end
+    return node
+
+
+def test_extract_function_lines_slices_node_lines():
+    """Test that the function's full lines are cut out around the node offsets."""
+    content = "class A:\r\n    def f(self):\r\n        return 1\r\n\r\nx = 1\r\n"
+    text = "def f(self):\r\n        return 1"
+    start = content.index(text)
+    func_info = {
+        'node': _function_node(text, start, start + len(text)),
+        'start_line': 1,
+        'end_line': 2,
+    }
+
+    assert CallStackGenerator._extract_function_lines(content, func_info) == (
+        "    def f(self):\n        return 1"
+    )
+
+
+def test_extract_function_lines_falls_back_to_line_numbers():
+    """Test that offsets not matching the content fall back to line slicing."""
+    content = "# é\ndef f():\n    return 1\n"
+    text = "def f():\n    return 1"
+    # Byte offsets are shifted by the two-byte character above the function
+    start = len(content[: content.index(text)].encode('utf-8'))
+    func_info = {
+        'node': _function_node(text, start, start + len(text)),
+        'start_line': 1,
+        'end_line': 2,
+    }
+
+    assert CallStackGenerator._extract_function_lines(content, func_info) == text
+
+
 def test_unsupported_language(generator):
     """Test handling of unsupported file types."""
     with pytest.raises(ValueError, match="Unsupported file type"):
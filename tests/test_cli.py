@@ -1,10 +1,12 @@
 """Tests for command-line interface."""
 
+import subprocess
+import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from repomap.cli import main, parse_args
+from repomap.cli import _build_parser, _collect_file_entries, main, parse_args
 
 
 def test_parse_args_defaults():
@@ -15,6 +17,7 @@ def test_parse_args_defaults():
     assert args.output == "repomap.json"
     assert not args.verbose
     assert not args.no_local_clone  # Default is to use local clone
+    assert args.mode == "repo_map"
 
 
 def test_parse_args_custom():
@@ -49,6 +52,16 @@ def test_parse_args_no_local_clone():
     assert args.no_local_clone
 
 
+def test_parse_args_reuses_parser():
+    """Test that repeated parsing reuses one parser without leaking state."""
+    first = parse_args(["https://example.com/repo", "--verbose"])
+    second = parse_args(["https://example.com/other"])
+
+    assert first.verbose and first.repo_url == "https://example.com/repo"
+    assert not second.verbose and second.repo_url == "https://example.com/other"
+    assert _build_parser() is _build_parser()
+
+
 def test_parse_args_missing_url():
     """Test argument parsing with missing repository URL."""
     with pytest.raises(SystemExit):
@@ -69,6 +82,7 @@ def test_parse_args_call_stack():
     assert args.call_stack
     assert args.target_file == "test.py"
     assert args.line == 10
+    assert args.mode == "call_stack"
 
 
 def test_parse_args_repo_tree():
@@ -84,6 +98,7 @@ def test_parse_args_repo_tree():
     assert args.repo_url == "https://example.com/repo"
     assert args.repo_tree
     assert args.ref == "develop"
+    assert args.mode == "repo_tree"
 
 
 def test_parse_args_print_function():
@@ -100,6 +115,16 @@ def test_parse_args_print_function():
     assert args.print_function
     assert args.target_file == "test.py"
     assert args.line == 10
+    assert args.mode == "print_function"
+
+
+def test_parse_args_accepts_line_zero():
+    """Test that line 0 counts as a given line number."""
+    args = parse_args(["--call-stack", "--target-file", "test.py", "--line", "0"])
+    assert args.line == 0
+
+    with pytest.raises(SystemExit):
+        parse_args(["--print-function", "--target-file", "test.py"])
 
 
 def test_parse_args_print_function_by_name():
@@ -116,6 +141,7 @@ def test_parse_args_print_function_by_name():
     assert args.print_function_by_name
     assert args.name == "test_function"
     assert args.repo_tree_path == "tree.json"
+    assert args.mode == "print_function_by_name"
 
 
 @patch('repomap.cli.RepoTreeGenerator')
@@ -325,6 +351,79 @@ def test_main_print_function_by_name_with_file_path(mock_generator):
     )
 
 
+@patch('repomap.cli.store_repo_map')
+@patch('repomap.cli.fetch_repo_structure')
+def test_main_repo_map_file_paths(mock_fetch, mock_store):
+    """Test that the repository map lists blobs by their "/"-joined paths."""
+    mock_fetch.return_value = {
+        'README.md': {'type': 'blob', 'mode': '100644', 'id': 'a'},
+        'src': {
+            'main.py': {'type': 'blob', 'mode': '100755', 'id': 'b'},
+            'pkg': {'util.py': {'type': 'blob', 'mode': '100644', 'id': 'c'}},
+        },
+    }
+    mock_store.return_value = 'repomap.json'
+
+    with patch('sys.argv', ['repomap', 'https://example.com/repo']):
+        assert main() == 0
+
+    repo_map = mock_store.call_args.args[0]
+    assert list(repo_map['ast_data']) == [
+        'README.md',
+        'src/main.py',
+        'src/pkg/util.py',
+    ]
+    assert repo_map['ast_data']['src/main.py'] == {
+        'path': 'src/main.py',
+        'size': 0,
+        'mode': '100755',
+    }
+
+
+@patch('repomap.cli.store_repo_map_ndjson')
+@patch('repomap.cli.fetch_repo_structure')
+def test_main_repo_map_ndjson_format(mock_fetch, mock_store_ndjson):
+    """Test that --format ndjson stores the map as newline-delimited JSON."""
+    mock_fetch.return_value = {'a.py': {'type': 'blob'}}
+    mock_store_ndjson.return_value = 'map.ndjson'
+
+    argv = ['repomap', 'https://example.com/repo', '-o', 'map.ndjson']
+    with patch('sys.argv', argv + ['--format', 'ndjson']):
+        assert main() == 0
+
+    repo_map, output = mock_store_ndjson.call_args.args
+    assert list(repo_map['ast_data']) == ['a.py']
+    assert output == 'map.ndjson'
+
+
+def test_collect_file_entries_handles_deep_trees():
+    """Test that structures deeper than the recursion limit are walked."""
+    structure = current = {}
+    for _ in range(sys.getrecursionlimit() + 100):
+        current['d'] = {}
+        current = current['d']
+    current['leaf.py'] = {'type': 'blob', 'mode': '100644'}
+
+    ast_data = {}
+    _collect_file_entries(structure, ast_data)
+
+    [path] = ast_data
+    assert path.endswith('/d/leaf.py')
+    assert path.count('/') == sys.getrecursionlimit() + 100
+
+
+def test_cli_imports_generators_lazily():
+    """Test that importing the CLI does not load the generators and providers."""
+    code = (
+        "import sys\n"
+        "import repomap.cli\n"
+        "assert 'repomap.providers' not in sys.modules\n"
+        "assert 'repomap.callstack' not in sys.modules\n"
+        "assert 'repomap.repo_tree' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
 @pytest.mark.skip("Causes pytest hang - needs investigation")
 def test_main_keyboard_interrupt():
     """Test main function handling keyboard interrupt."""
@@ -0,0 +1,33 @@
+"""Tests for application settings."""
+
+from repomap.config import SecretStr, Settings
+
+
+def test_settings_from_env():
+    """Test reading tokens and the cache directory from the environment."""
+    settings = Settings.from_env(
+        {
+            'GITLAB_TOKEN': 'gl-token',
+            'REPOMAP_CACHE_DIR': '/tmp/cache',
+            'github_token': 'wrong case',
+        }
+    )
+
+    assert settings.GITLAB_TOKEN.get_secret_value() == 'gl-token'
+    assert settings.GITHUB_TOKEN is None
+    assert settings.REPOMAP_CACHE_DIR == '/tmp/cache'
+
+
+def test_settings_defaults():
+    """Test that unset variables leave the settings empty."""
+    assert Settings.from_env({}) == Settings()
+
+
+def test_secret_str_is_masked():
+    """Test that secrets do not leak through str or repr."""
+    secret = SecretStr('gl-token')
+
+    assert 'gl-token' not in str(secret)
+    assert 'gl-token' not in repr(secret)
+    assert repr(Settings(GITLAB_TOKEN=secret)).count('gl-token') == 0
+    assert not SecretStr('')
@@ -2,7 +2,8 @@
 
 from unittest.mock import Mock, patch
 
-from repomap import RepoTreeGenerator, fetch_repo_structure
+from repomap import RepoTreeGenerator, fetch_repo_structure, fetch_repo_structures
+from repomap.core import clear_structure_cache
 
 
 @patch('repomap.repo_tree.CallStackGenerator')
@@ -20,6 +21,7 @@ def test_repo_tree_generator_import(mock_callstack):
 @patch('repomap.core.get_provider')
 def test_fetch_repo_structure_import(mock_get_provider):
     """Test that fetch_repo_structure can be imported and called."""
+    clear_structure_cache()
     # Mock the provider
     mock_provider = Mock()
     mock_provider.fetch_repo_structure.return_value = {"test": "data"}
@@ -37,6 +39,46 @@ def test_fetch_repo_structure_import(mock_get_provider):
     )
 
 
+@patch('repomap.core.get_provider')
+def test_fetch_repo_structure_is_cached(mock_get_provider):
+    """Test that repeated fetches of one repository reuse the first result."""
+    clear_structure_cache()
+    mock_provider = Mock()
+    mock_provider.fetch_repo_structure.return_value = {"src": {"a.py": {}}}
+    mock_get_provider.return_value = mock_provider
+
+    first = fetch_repo_structure("https://github.com/user/repo", token="token")
+    first["src"]["b.py"] = {}
+    second = fetch_repo_structure("https://github.com/user/repo", token="token")
+    fetch_repo_structure("https://github.com/user/repo", token="other")
+
+    assert second == {"src": {"a.py": {}}}
+    assert mock_provider.fetch_repo_structure.call_count == 2
+
+    clear_structure_cache()
+    fetch_repo_structure("https://github.com/user/repo", token="token")
+    assert mock_provider.fetch_repo_structure.call_count == 3
+    clear_structure_cache()
+
+
+@patch('repomap.core.get_provider')
+def test_fetch_repo_structures(mock_get_provider):
+    """Test fetching several repositories at once, keyed by URL."""
+    clear_structure_cache()
+    mock_provider = Mock()
+    mock_provider.fetch_repo_structure.side_effect = lambda url: {url[-1]: {}}
+    mock_get_provider.return_value = mock_provider
+
+    urls = [f"https://gitlab.com/group/{name}" for name in "cab"]
+    result = fetch_repo_structures(urls + urls[:1], token="token", max_workers=2)
+
+    assert list(result) == urls
+    assert result[urls[0]] == {"c": {}}
+    assert mock_provider.fetch_repo_structure.call_count == 3
+    assert fetch_repo_structures([]) == {}
+    clear_structure_cache()
+
+
 @patch('repomap.repo_tree.get_provider')
 @patch('repomap.repo_tree.CallStackGenerator')
 def test_repo_tree_generator_basic_usage(mock_callstack, mock_get_provider):
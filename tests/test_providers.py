@@ -185,6 +185,241 @@ def test_gitlab_provider_get_file_content(mock_gitlab):
     assert content == 'file content'
 
 
+def test_gitlab_provider_get_project_parts():
+    """Test splitting GitLab URLs into group path and project name."""
+    provider = GitLabProvider()
+    url = 'https://gitlab.com/group/subgroup/repo'
+
+    assert provider._get_project_parts(url) == ('group/subgroup', 'repo')
+    assert provider._get_project_parts(url) == ('group/subgroup', 'repo')
+    with pytest.raises(ValueError, match="Invalid repository URL format"):
+        provider._get_project_parts('https://gitlab.com/repo')
+
+
+def test_gitlab_provider_build_structure():
+    """Test nesting a flat GitLab tree listing into directories."""
+    items = [
+        {'type': 'tree', 'path': 'src', 'mode': '040000', 'id': 't1'},
+        {'type': 'blob', 'path': 'src/main.py', 'id': 'b1'},
+        {'type': 'blob', 'path': 'src/pkg/deep/mod.py', 'id': 'b2'},
+        {'type': 'blob', 'path': 'src/pkg/util.py', 'id': 'b3'},
+        {'type': 'blob', 'path': 'README.md', 'id': 'b4'},
+    ]
+
+    structure = GitLabProvider._build_structure(items)
+
+    assert structure == {
+        'src': {
+            'type': 'tree',
+            'mode': '040000',
+            'id': 't1',
+            'main.py': {'type': 'blob', 'mode': '100644', 'id': 'b1'},
+            'pkg': {
+                'deep': {'mod.py': {'type': 'blob', 'mode': '100644', 'id': 'b2'}},
+                'util.py': {'type': 'blob', 'mode': '100644', 'id': 'b3'},
+            },
+        },
+        'README.md': {'type': 'blob', 'mode': '100644', 'id': 'b4'},
+    }
+
+
+def test_gitlab_provider_build_structure_shares_names():
+    """Test that repeated names and types share one string object."""
+    # Build the strings at runtime, as decoded JSON would, so they start out
+    # as distinct objects
+    items = [
+        {'type': ''.join(['bl', 'ob']), 'path': f'{d}/{"".join(["sr", "c"])}/a.py'}
+        for d in ('x', 'y')
+    ]
+    for i, item in enumerate(items):
+        item['id'] = str(i)
+
+    structure = GitLabProvider._build_structure(items)
+
+    x_src, y_src = (next(iter(structure[d])) for d in ('x', 'y'))
+    assert x_src == 'src' and x_src is y_src
+    x_file, y_file = (structure[d]['src']['a.py'] for d in ('x', 'y'))
+    assert x_file['type'] is y_file['type']
+
+
+def test_gitlab_provider_fetches_tree_pages_concurrently(mock_gitlab):
+    """Test that remaining tree pages are fetched by page number, kept in order."""
+    pages = {
+        page: [
+            {'type': 'blob', 'path': f'dir{page}/file{i}.py', 'id': f'{page}-{i}'}
+            for i in range(2)
+        ]
+        for page in range(1, 4)
+    }
+
+    class FirstPage(list):
+        """Stand-in for the lazy page list python-gitlab returns."""
+
+        total_pages = 3
+        per_page = 2
+
+        def __iter__(self):
+            # A lazy list keeps following next links past the first page
+            return iter(pages[1] + pages[2] + pages[3] + [{'path': 'followed'}])
+
+    def repository_tree(**kwargs):
+        if kwargs.get('iterator'):
+            return FirstPage()
+        return pages[kwargs['page']]
+
+    mock_gitlab.projects.get.return_value.repository_tree.side_effect = (
+        repository_tree
+    )
+
+    provider = GitLabProvider()
+    structure = provider.fetch_repo_structure('https://gitlab.com/owner/repo')
+
+    assert list(structure) == ['dir1', 'dir2', 'dir3']
+    assert structure['dir3']['file1.py']['id'] == '3-1'
+    requested_pages = sorted(
+        call.kwargs['page']
+        for call in mock_gitlab.projects.get.return_value.repository_tree.call_args_list
+        if 'page' in call.kwargs
+    )
+    assert requested_pages == [2, 3]
+
+
+def test_gitlab_provider_continues_large_tree_with_keyset(mock_gitlab):
+    """Test that listings without a page count continue with keyset pages."""
+    first_page = [
+        {'type': 'blob', 'path': f'a{i}.py', 'id': f'a{i}'} for i in range(2)
+    ]
+    rest = [{'type': 'blob', 'path': 'b.py', 'id': 'b'}]
+
+    class FirstPage(list):
+        """Stand-in for a lazy page list without a total page count."""
+
+        total_pages = None
+        per_page = 2
+
+    repository_tree = mock_gitlab.projects.get.return_value.repository_tree
+    repository_tree.side_effect = lambda **kwargs: (
+        rest if kwargs.get('pagination') == 'keyset' else FirstPage(first_page)
+    )
+
+    provider = GitLabProvider()
+    structure = provider.fetch_repo_structure('https://gitlab.com/owner/repo')
+
+    assert list(structure) == ['a0.py', 'a1.py', 'b.py']
+    assert repository_tree.call_args.kwargs['page_token'] == 'a1'
+
+
+def test_gitlab_provider_large_tree_without_keyset(mock_gitlab):
+    """Test following offset pages when keyset pagination is rejected."""
+    items = [{'type': 'blob', 'path': f'{i}.py', 'id': str(i)} for i in range(3)]
+
+    class LazyPages:
+        """Stand-in for a lazy page list that follows next-page links."""
+
+        total_pages = None
+        per_page = 2
+
+        def __init__(self):
+            self._items = iter(items)
+
+        def __iter__(self):
+            return self._items
+
+    def repository_tree(**kwargs):
+        if kwargs.get('pagination') == 'keyset':
+            raise gitlab.exceptions.GitlabGetError('keyset not supported')
+        return LazyPages()
+
+    mock_gitlab.projects.get.return_value.repository_tree.side_effect = (
+        repository_tree
+    )
+
+    provider = GitLabProvider()
+    structure = provider.fetch_repo_structure('https://gitlab.com/owner/repo')
+
+    assert list(structure) == ['0.py', '1.py', '2.py']
+
+
+def test_gitlab_provider_walks_directories(mock_gitlab):
+    """Test listing a tree one directory at a time instead of recursively."""
+    directories = {
+        '': [
+            {'type': 'tree', 'path': 'src', 'mode': '040000', 'id': 't1'},
+            {'type': 'blob', 'path': 'README.md', 'id': 'b1'},
+        ],
+        'src': [
+            {'type': 'tree', 'path': 'src/pkg', 'mode': '040000', 'id': 't2'},
+            {'type': 'blob', 'path': 'src/main.py', 'id': 'b2'},
+        ],
+        'src/pkg': [{'type': 'blob', 'path': 'src/pkg/mod.py', 'id': 'b3'}],
+    }
+    repository_tree = mock_gitlab.projects.get.return_value.repository_tree
+    repository_tree.side_effect = lambda **kwargs: directories[kwargs['path']]
+
+    provider = GitLabProvider()
+    structure = provider.fetch_repo_structure(
+        'https://gitlab.com/owner/repo', walk_directories=True
+    )
+
+    assert structure == GitLabProvider._build_structure(
+        item for items in directories.values() for item in items
+    )
+    assert structure['src']['pkg']['mod.py']['id'] == 'b3'
+    assert not any(call.kwargs['recursive'] for call in repository_tree.call_args_list)
+
+
+def test_gitlab_provider_caches_tree_by_commit(mock_gitlab, tmp_path):
+    """Test that the tree of a commit is fetched once and then read from disk."""
+    mock_project = mock_gitlab.projects.get.return_value
+    mock_project.id = 42
+    mock_project.commits.get.return_value.id = 'abc123'
+
+    first = GitLabProvider(cache_dir=str(tmp_path)).fetch_repo_structure(
+        'https://gitlab.com/owner/repo'
+    )
+    second = GitLabProvider(cache_dir=str(tmp_path)).fetch_repo_structure(
+        'https://gitlab.com/owner/repo'
+    )
+
+    assert second == first
+    assert mock_project.repository_tree.call_count == 1
+    assert list(tmp_path.glob('trees/*/abc123.json'))
+    # The listing is pinned to the resolved commit, not the moving branch
+    mock_project.commits.get.assert_called_with('main')
+    assert mock_project.repository_tree.call_args.kwargs['ref'] == 'abc123'
+
+    # A moved branch resolves to another commit and is fetched again
+    mock_project.commits.get.return_value.id = 'def456'
+    GitLabProvider(cache_dir=str(tmp_path)).fetch_repo_structure(
+        'https://gitlab.com/owner/repo'
+    )
+    assert mock_project.repository_tree.call_count == 2
+
+
+def test_gitlab_provider_reuses_client_and_project(mock_gitlab):
+    """Test that GitLab client and project lookups are done once per provider."""
+    mock_file = MagicMock()
+    mock_file.decode.return_value.decode.return_value = 'file content'
+    mock_gitlab.projects.get.return_value.files.get.return_value = mock_file
+
+    provider = GitLabProvider()
+    for name in ('a.py', 'b.py', 'c.py'):
+        assert (
+            provider.get_file_content(
+                f'https://gitlab.com/owner/repo/-/blob/main/{name}'
+            )
+            == 'file content'
+        )
+    provider.validate_ref('https://gitlab.com/owner/repo', 'main')
+
+    mock_gitlab.projects.get.assert_called_once_with('owner/repo')
+    gitlab.Gitlab.assert_called_once()
+    assert gitlab.Gitlab.call_args.kwargs['retry_transient_errors'] is True
+    with patch('repomap.providers.gitlab.Gitlab') as gitlab_class:
+        provider.get_file_content('https://gitlab.com/owner/repo/-/blob/main/d.py')
+    gitlab_class.assert_not_called()
+
+
 class TestLocalRepoProvider:
     """Tests for LocalRepoProvider."""
 
@@ -418,32 +653,23 @@ class TestLocalRepoProvider:
             assert structure == {'file.py': {'type': 'blob'}}
             mock_get_provider.assert_called_once()
 
-    @patch('pathlib.Path.iterdir')
-    def test_build_structure_from_path(self, mock_iterdir):
+    def test_build_structure_from_path(self, tmp_path):
         """Test building repository structure from local filesystem."""
-        from pathlib import Path
-
-        # Mock file and directory items
-        mock_file = MagicMock(spec=Path)
-        mock_file.name = 'test.py'
-        mock_file.is_file.return_value = True
-        mock_file.is_dir.return_value = False
-
-        mock_dir = MagicMock(spec=Path)
-        mock_dir.name = 'src'
-        mock_dir.is_file.return_value = False
-        mock_dir.is_dir.return_value = True
-        mock_dir.iterdir.return_value = []
-
-        mock_iterdir.return_value = [mock_file, mock_dir]
+        (tmp_path / 'test.py').write_text('print(1)\n')
+        (tmp_path / 'src' / 'pkg').mkdir(parents=True)
+        (tmp_path / 'src' / 'pkg' / 'mod.py').write_text('x = 1\n')
+        (tmp_path / '.git').mkdir()
+        (tmp_path / '.git' / 'HEAD').write_text('ref: refs/heads/main\n')
 
         provider = LocalRepoProvider()
-        structure = provider._build_structure_from_path(Path('/fake/path'))
+        structure = provider._build_structure_from_path(tmp_path)
 
         assert 'test.py' in structure
         assert structure['test.py']['type'] == 'blob'
         assert 'src' in structure
         assert isinstance(structure['src'], dict)
+        assert structure['src']['pkg']['mod.py']['type'] == 'blob'
+        assert '.git' not in structure
 
 
 def test_github_provider_get_last_commit_hash(mock_github):
@@ -1142,6 +1142,37 @@ def test_generate_repo_tree_with_failed_content_fetch(mock_gitlab, repo_tree_gen
         assert len(repo_tree["files"]) == 0
 
 
+def test_process_file_worker_reads_local_clone(tmp_path):
+    """Test the multiprocessing worker parses files straight from the local clone."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("def main():\n    helper()\n")
+    (tmp_path / "src" / "pkg.py").mkdir()  # Directory with a source extension
+    (tmp_path / "src" / "empty.py").write_text("")
+
+    def run(path):
+        return RepoTreeGenerator._process_file_worker(
+            (
+                path,
+                {},
+                "https://example.com/group/repo",
+                "main",
+                None,
+                True,
+                str(tmp_path),
+            )
+        )
+
+    path, data = run("src/main.py")
+    assert path == "src/main.py"
+    assert data["language"] == "python"
+    assert "main" in data["ast"]["functions"]
+
+    # Directories, empty files and missing files are skipped
+    assert run("src/pkg.py") == ("src/pkg.py", None)
+    assert run("src/empty.py") == ("src/empty.py", None)
+    assert run("src/missing.py") == ("src/missing.py", None)
+
+
 @patch('gitlab.Gitlab')
 def test_generate_repo_tree_with_custom_ref(
     mock_gitlab, repo_tree_generator, mock_python_content
@@ -1547,6 +1578,34 @@ class TestRepoTreeCommitHash:
         assert repo_tree['metadata']['url'] == 'https://github.com/owner/repo'
         assert repo_tree['metadata']['ref'] == 'main'
 
+    @patch('repomap.repo_tree.get_provider')
+    @patch.object(RepoTreeGenerator, '_get_file_content')
+    def test_generate_repo_tree_fetches_api_files_concurrently(
+        self, mock_get_content, mock_get_provider
+    ):
+        """Test that API file fetches are all issued and matched to their paths."""
+        mock_provider = Mock()
+        mock_provider.validate_ref.return_value = 'main'
+        mock_provider.get_last_commit_hash.return_value = 'abc123def456'
+        mock_provider.fetch_repo_structure.return_value = {
+            f'mod_{i}.py': {'type': 'blob', 'mode': '100644', 'id': f'file{i}'}
+            for i in range(20)
+        } | {'README.md': {'type': 'blob', 'mode': '100644', 'id': 'readme'}}
+        mock_get_provider.return_value = mock_provider
+        mock_get_content.side_effect = lambda url: (
+            f"def {url.rsplit('/', 1)[-1][:-3]}():\n    pass\n"
+        )
+
+        generator = RepoTreeGenerator(use_multiprocessing=False, use_local_clone=False)
+        repo_tree = generator.generate_repo_tree('https://github.com/owner/repo')
+
+        # Unsupported files are never requested
+        assert mock_get_content.call_count == 20
+        assert len(repo_tree['files']) == 20
+        for i in range(20):
+            functions = repo_tree['files'][f'mod_{i}.py']['ast']['functions']
+            assert f'mod_{i}' in functions
+
     @patch('repomap.providers.get_provider')
     def test_is_repo_tree_up_to_date_no_file(self, mock_get_provider):
         """Test is_repo_tree_up_to_date returns False when no file exists."""
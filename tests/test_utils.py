@@ -2,12 +2,21 @@
 
 import json
 import logging
+from contextlib import nullcontext
 from pathlib import Path
 from unittest.mock import mock_open, patch
 
 import pytest
 
-from repomap.utils import load_repo_map, setup_logging, store_repo_map
+from repomap.utils import (
+    dumps_json,
+    load_json_cache,
+    load_repo_map,
+    setup_logging,
+    store_json_cache,
+    store_repo_map,
+    store_repo_map_ndjson,
+)
 
 
 @pytest.fixture
@@ -154,3 +163,58 @@ def test_store_repo_map_creates_directories(sample_repo_map, tmp_path):
     with open(nested_path, "r", encoding="utf-8") as f:
         stored_data = json.load(f)
         assert stored_data == sample_repo_map
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_dumps_json_matches_json_module(sample_repo_map, use_orjson, ensure_ascii):
+    """Test that dumps_json writes the same text as json.dumps(indent=2)."""
+    data = dict(
+        sample_repo_map, extra={"empty": {}, "list": [], "name": "naïve", 1: None}
+    )
+    expected = json.dumps(data, indent=2, ensure_ascii=ensure_ascii)
+
+    with nullcontext() if use_orjson else patch("repomap.utils.orjson", None):
+        assert dumps_json(data, ensure_ascii=ensure_ascii) == expected
+
+
+def test_store_repo_map_ndjson(sample_repo_map, tmp_path):
+    """Test storing repository map as one JSON document per line."""
+    output_file = tmp_path / "map.ndjson"
+
+    result = store_repo_map_ndjson(sample_repo_map, str(output_file))
+
+    assert result == str(output_file)
+    lines = output_file.read_text(encoding="utf-8").splitlines()
+    header, *entries = [json.loads(line) for line in lines]
+    assert header == {
+        "metadata": sample_repo_map["metadata"],
+        "structure": sample_repo_map["structure"],
+        "schema": "ndjson-v1",
+    }
+    assert entries == [
+        {path: entry} for path, entry in sample_repo_map["ast_data"].items()
+    ]
+
+
+def test_json_cache_round_trip(tmp_path):
+    """Test storing and loading an on-disk JSON cache entry."""
+    cache_path = tmp_path / "ab" / "entry.json"
+
+    assert load_json_cache(cache_path) is None
+    store_json_cache(cache_path, {"src": {"a.py": {}}})
+    assert load_json_cache(cache_path) == {"src": {"a.py": {}}}
+    assert [p.name for p in cache_path.parent.iterdir()] == ["entry.json"]
+
+    cache_path.write_text("{not json", encoding="utf-8")
+    assert load_json_cache(cache_path) is None
+
+
+def test_store_json_cache_ignores_write_errors(tmp_path):
+    """Test that a cache that cannot be written does not raise."""
+    blocker = tmp_path / "file"
+    blocker.write_text("", encoding="utf-8")
+
+    store_json_cache(blocker / "entry.json", {"a": 1})
+
+    assert load_json_cache(blocker / "entry.json") is None